@@ -0,0 +1,496 @@
+"""
+Ad Insights Agent Base
+두 에이전트가 공유하는 수집 엔진과 리포트 구성 (검색 / 동시 수집 / 마감 / 스케줄러 / 저장소 / 리포트 / 슬랙 메시지)
+
+전송 방식(수신처 하나 / 여러 수신처)만 에이전트마다 다르게 구현
+"""
+
+import os
+import requests
+import json
+from datetime import datetime
+from typing import List, Dict, Optional, Iterator, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+
+from deadline import Deadline, API_TIMEOUT, DELIVERY_RESERVE, SEND_RESERVE
+from deep_dive import DeepDive
+from grounding import Grounding
+from html_renderer import HtmlReportRenderer
+from insight_store import InsightStore, STORE_FIELDS
+from query_scheduler import QueryScheduler
+from report_labels import LABELS
+from report_packing import pack_slack_blocks, pack_email_html
+from slack_delivery import SlackThread, build_category_blocks, CONSUMED_FIELDS as SLACK_FIELDS
+from wire_schema import REPORT_FIELDS, requested_fields, schema_prompt, expand
+
+
+class AdInsightsAgentBase:
+    def __init__(self, anthropic_api_key: Optional[str] = None):
+        self.today = datetime.now().strftime("%Y-%m-%d")
+        self.api_key = anthropic_api_key or os.getenv('ANTHROPIC_API_KEY')
+        self.model = "claude-sonnet-4-20250514"
+        self.report_title = "광고 시장 Daily Brief"
+        
+        # 검색 쿼리 정의
+        self.search_queries = [
+            # 시장 트렌드
+            "디지털 광고 시장 트렌드 2025",
+            "performance marketing 최신 동향",
+            "retail media 성장",
+            "쿠키리스 광고 대응",
+            
+            # 플랫폼 동향
+            "네이버 광고 신규 상품",
+            "카카오 광고 업데이트",
+            "구글 애즈 변경사항",
+            "메타 광고 뉴스",
+            "틱톡 광고 한국",
+            
+            # 기술 트렌드
+            "AI 광고 자동화",
+            "생성형 AI 마케팅 활용",
+            "광고 측정 attribution",
+            
+            # 규제
+            "개인정보보호 광고 규제",
+            "온라인 플랫폼 법안",
+        ]
+        
+        # 카테고리 정의 (리포트 섹션 순서 = 정의 순서, 쿼리 키워드로 분류)
+        self.categories = {
+            "🔥 오늘의 핵심 트렌드": ['트렌드', '시장', '성장', 'retail'],
+            "📱 주요 플랫폼 동향": ['네이버', '카카오', '구글', '메타', '틱톡'],
+            "🤖 기술 & 혁신": ['ai', '기술', '자동화', '측정'],
+            "⚖️ 규제 & 정책": ['규제', '법', '정책', '보호'],
+        }
+        
+        self.insight_db_path = os.getenv('INSIGHT_DB_PATH')
+        
+        # 쿼리별 적응형 갱신 주기 (QUERY_SCHEDULE_PATH 지정시 사용)
+        schedule_path = os.getenv('QUERY_SCHEDULE_PATH')
+        self.scheduler = QueryScheduler(
+            schedule_path,
+            max_interval=int(os.getenv('QUERY_MAX_INTERVAL_DAYS', '7'))
+        ) if schedule_path else None
+        
+        # 동시 검색 수 (1이면 순차 실행)
+        self.max_workers = int(os.getenv('COLLECT_CONCURRENCY', '1'))
+        
+        # 실행 마감 (RUN_DEADLINE, 없으면 제한 없음) - 지나면 남은 쿼리는 건너뛰고 부분 리포트 전송
+        self.deadline = Deadline.parse(os.getenv('RUN_DEADLINE'))
+        
+        # 근거 자료 출처 (GROUNDING_SOURCES가 있을 때만, 새로 나온 내용만 프롬프트에 첨부)
+        self.grounding = Grounding.from_env()
+        
+        # 심층 조사 주제 (DEEP_DIVE_QUERIES, 세부 쿼리로 나눠 동시 검색 후 종합)
+        self.deep_dive = DeepDive.from_env()
+        
+        # 봇 토큰 + 채널이 있으면 스레드로 게시 (웹훅은 후속 메시지를 순서대로 게시)
+        self.slack_bot_token = os.getenv('SLACK_BOT_TOKEN')
+        self.slack_channels = [c.strip() for c in os.getenv('SLACK_CHANNEL', '').split(',') if c.strip()]
+        
+        # 이메일 HTML 렌더러 (템플릿은 모듈 로드시 한 번만 컴파일)
+        self.html_renderer = HtmlReportRenderer()
+        
+        # 리포트 / 슬랙 / 이메일 고정 문구
+        self.labels = dict(LABELS)
+        
+        self.results = []
+        self.failed_queries = []
+        self.skipped_queries = []
+    
+    def search_with_claude(self, query: str) -> Dict:
+        """Claude API를 사용하여 웹 검색 및 요약"""
+        
+        fields = self.wire_fields()
+        reference = self.grounding.context_for(query) if self.grounding else ''
+        if reference:
+            reference = f"""
+
+아래는 오늘 새로 확인된 출처 내용입니다. 관련 있는 내용은 근거로 활용하고 출처 목록(src)에 해당 출처를 적어주세요:
+{reference}"""
+        
+        prompt = f"""
+오늘 날짜는 {self.today}입니다.
+
+다음 주제에 대해 최신 정보를 웹에서 검색하고 핵심 인사이트를 정리해주세요:
+"{query}"{reference}
+
+{schema_prompt(fields)}
+
+검색 결과가 없거나 관련 정보가 없다면 해당 내용을 명시해주세요.
+"""
+        
+        try:
+            content = self._call_claude(prompt, label=query)
+            if content is None:
+                return None
+            
+            # JSON 파싱 (마크다운 코드 블록 제거)
+            content = self._strip_code_block(content)
+            try:
+                result = expand(json.loads(content), query, fields)
+                result['timestamp'] = self.today
+                return result
+            except json.JSONDecodeError:
+                print(f"JSON 파싱 실패: {query}")
+                return self._create_fallback_result(query, content)
+                
+        except Exception as e:
+            print(f"검색 오류 ({query}): {e}")
+            return None
+    
+    def research(self, query: str) -> Optional[Dict]:
+        """쿼리 하나 조사 (심층 조사 주제면 세부 쿼리 map-reduce, 아니면 일반 검색)"""
+        if self.deep_dive and self.deep_dive.selects(query):
+            return self.deep_dive.run(self, query)
+        return self.search_with_claude(query)
+    
+    def wire_fields(self) -> List[str]:
+        """응답에 요청할 필드 (리포트 / 슬랙 / 이메일 렌더러와 설정된 저장소 / 근거 자료가 쓰는 것만)"""
+        consumers = [REPORT_FIELDS, SLACK_FIELDS, self.html_renderer.consumed_fields]
+        if self.insight_db_path:
+            consumers.append(STORE_FIELDS)
+        if self.grounding:
+            consumers.append(('sources',))
+        return requested_fields(consumers)
+    
+    def _call_claude(self, prompt: str, max_tokens: int = 2000, label: str = '',
+                     deadline: Optional[Deadline] = None) -> Optional[str]:
+        """Claude Messages API 호출 후 응답 텍스트 반환 (실패시 None, deadline 기본값은 수집 마감)"""
+        response = requests.post(
+            "https://api.anthropic.com/v1/messages",
+            headers={
+                "Content-Type": "application/json",
+                "x-api-key": self.api_key,
+                "anthropic-version": "2023-06-01"
+            },
+            json={
+                "model": self.model,
+                "max_tokens": max_tokens,
+                "messages": [
+                    {"role": "user", "content": prompt}
+                ]
+            },
+            timeout=(deadline or self.collect_deadline).timeout(API_TIMEOUT)
+        )
+        
+        if response.status_code == 200:
+            return response.json()['content'][0]['text']
+        
+        print(f"API 오류 ({label}): {response.status_code}")
+        return None
+    
+    @staticmethod
+    def _strip_code_block(content: str) -> str:
+        """마크다운 코드 블록 제거"""
+        if '```json' in content:
+            return content.split('```json')[1].split('```')[0].strip()
+        if '```' in content:
+            return content.split('```')[1].split('```')[0].strip()
+        return content
+    
+    def _create_fallback_result(self, query: str, content: str) -> Dict:
+        """JSON 파싱 실패시 대체 결과 생성"""
+        return {
+            "query": query,
+            "key_findings": [content[:200]],
+            "summary": content[:300],
+            "impact": "상세 분석 필요",
+            "actionable_insight": "추가 조사 권장",
+            "sources": [],
+            "timestamp": self.today
+        }
+    
+    def collect_all_insights(self):
+        """모든 쿼리에 대해 인사이트 수집"""
+        collected = {}
+        for index, result in self.iter_insights():
+            if result:
+                collected[index] = result
+        
+        # 완료 순서와 관계없이 원래 쿼리 순서 유지
+        self.results.extend(collected[i] for i in sorted(collected))
+        
+        print(f"✨ 수집 완료! 총 {len(self.results)}개 인사이트 확보\n")
+    
+    def iter_insights(self) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """쿼리가 끝나는 대로 (쿼리 위치, 결과)를 하나씩 반환 (실패시 결과는 None)"""
+        print(f"\n🚀 {self.today} 광고 시장 인사이트 수집 시작\n")
+        print(f"총 {len(self.search_queries)}개 주제 검색 예정...\n")
+        
+        total = len(self.search_queries)
+        pending = []
+        reused = 0
+        
+        try:
+            if self.grounding:
+                self.grounding.refresh(self.collect_deadline)
+            
+            for i, query in enumerate(self.search_queries):
+                # 새 근거 자료가 있는 쿼리는 갱신 주기와 관계없이 다시 검색
+                fresh_sources = self.grounding and self.grounding.has_new(query)
+                if self.scheduler and not fresh_sources and not self.scheduler.is_due(query, self.today):
+                    result = self.scheduler.cached_result(query)
+                    reused += 1
+                    print(f"[{i + 1}/{total}] ♻️  최근 결과 재사용: {query} (마지막 확인: {result['last_checked']})\n")
+                    yield i, result
+                else:
+                    pending.append(i)
+            
+            deadline = self.collect_deadline
+            if deadline.limited:
+                print(f"⏰ 수집 마감: {deadline}\n")
+            
+            if self.max_workers <= 1:
+                for n, i in enumerate(pending):
+                    if deadline.expired:
+                        yield from self._skip_queries(pending[n:])
+                        break
+                    query = self.search_queries[i]
+                    print(f"[{i + 1}/{total}] 🔍 검색 중: {query}")
+                    yield i, self._finish_query(query, self.research(query))
+            else:
+                print(f"⚡ {self.max_workers}개 동시 검색\n")
+                executor = ThreadPoolExecutor(max_workers=self.max_workers)
+                try:
+                    futures = {executor.submit(self.research, self.search_queries[i]): i for i in pending}
+                    finished = set()
+                    try:
+                        for future in as_completed(futures, timeout=deadline.remaining()):
+                            i = futures[future]
+                            finished.add(i)
+                            print(f"[{i + 1}/{total}] 🔍 {self.search_queries[i]}")
+                            yield i, self._finish_query(self.search_queries[i], future.result())
+                    except FuturesTimeoutError:
+                        # 마감 직전에 끝난 것은 살리고, 나머지는 취소 (진행 중인 호출은 타임아웃으로 곧 끝남)
+                        unfinished = []
+                        for future, i in futures.items():
+                            if i in finished:
+                                continue
+                            if future.done() and not future.cancelled():
+                                yield i, self._finish_query(self.search_queries[i], future.result())
+                            else:
+                                unfinished.append(i)
+                        yield from self._skip_queries(sorted(unfinished))
+                finally:
+                    executor.shutdown(wait=False, cancel_futures=True)
+        finally:
+            if self.grounding:
+                self.grounding.save(self.search_queries)
+            if self.scheduler:
+                self.scheduler.save()
+                print(f"📅 API 호출 {total - reused}회 / 최근 결과 재사용 {reused}회")
+    
+    @property
+    def collect_deadline(self) -> Deadline:
+        """수집 마감 (전송할 시간을 남겨둔 실행 마감)"""
+        return self.deadline.reserve(DELIVERY_RESERVE)
+    
+    @property
+    def prepare_deadline(self) -> Deadline:
+        """전송 전 준비 작업(번역 등) 마감 - 준비가 늦어져도 전송 호출 시간은 남도록 실행 마감보다 앞당김"""
+        return self.deadline.reserve(SEND_RESERVE)
+    
+    def _skip_queries(self, indices: List[int]) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """마감으로 검색하지 못한 쿼리 기록 (결과 없이 위치만 반환)"""
+        if indices:
+            print(f"⏰ 수집 마감 - {len(indices)}개 주제 건너뜀\n")
+        for i in indices:
+            self.skipped_queries.append(self.search_queries[i])
+            yield i, None
+    
+    def _finish_query(self, query: str, result: Optional[Dict]) -> Optional[Dict]:
+        """검색 결과 후처리 (스케줄러 기록, 실패 / 건너뜀 목록 관리)"""
+        if result:
+            if self.scheduler:
+                self.scheduler.record(query, result, self.today)
+            if self.grounding:
+                self.grounding.record_success(query)
+            print(f"   ✅ 완료\n")
+        elif self.collect_deadline.expired:
+            # 마감 때문에 잘린 호출은 실패가 아니라 건너뜀으로
+            self.skipped_queries.append(query)
+            print(f"   ⏰ 마감으로 중단\n")
+        else:
+            self.failed_queries.append(query)
+            print(f"   ⚠️  결과 없음\n")
+        return result
+    
+    def generate_comprehensive_report(self) -> str:
+        """포괄적인 리포트 생성"""
+        
+        report = f"""
+╔══════════════════════════════════════════════════════════╗
+║         🎯 {self.report_title} - {self.today}         ║
+╚══════════════════════════════════════════════════════════╝
+
+{self.labels['greeting']}
+
+"""
+        
+        if self.skipped_queries:
+            report += f"⚠️  {self.partial_notice()}\n"
+            for query in self.skipped_queries:
+                report += f"   • {query}\n"
+            report += "\n"
+        
+        categories = self._group_by_category()
+        
+        for category, items in categories.items():
+            if items:
+                report += f"\n{'='*60}\n"
+                report += f"{category}\n"
+                report += f"{'='*60}\n\n"
+                
+                for item in items:
+                    report += f"📌 {item['query']}"
+                    if item.get('last_checked'):
+                        report += f" ({self.labels['last_checked']}: {item['last_checked']})"
+                    report += "\n"
+                    report += f"   {item['summary']}\n\n"
+                    
+                    if item.get('key_findings'):
+                        report += f"   {self.labels['key_points']}:\n"
+                        for finding in item['key_findings'][:3]:
+                            report += f"   • {finding}\n"
+                    
+                    if item.get('actionable_insight'):
+                        report += f"\n   💡 {self.labels['action']}: {item['actionable_insight']}\n"
+                    
+                    report += "\n" + "-"*60 + "\n\n"
+        
+        report += f"\n{'='*60}\n"
+        report += f"📊 {self.labels['overview']}\n"
+        report += f"{'='*60}\n\n"
+        report += f"✅ {self.labels['collected'].format(count=len(self.results))}\n"
+        report += f"📅 {self.labels['next_brief']}: {self._get_next_day()}\n\n"
+        
+        report += f"""
+💬 {self.labels['feedback']}
+
+---
+Powered by Advanced Ad Insights Agent 🤖
+"""
+        
+        return report
+    
+    def _categorize(self, query: str) -> Optional[str]:
+        """쿼리 키워드로 카테고리 결정 (해당 없으면 None)"""
+        query = query.lower()
+        for category, keywords in self.categories.items():
+            if any(k in query for k in keywords):
+                return category
+        return None
+    
+    def save_to_store(self, db_path: Optional[str] = None) -> int:
+        """수집 결과를 인사이트 저장소(SQLite)에 기록"""
+        db_path = db_path or self.insight_db_path
+        # 재사용된 결과는 이미 확인한 날짜로 저장되어 있으므로 제외
+        fresh_results = [r for r in self.results if not r.get('last_checked')]
+        if not db_path or not fresh_results:
+            return 0
+        
+        with InsightStore(db_path) as store:
+            count = store.save_run(self.today, fresh_results, self._categorize)
+        
+        print(f"🗄️  인사이트 저장소 기록: {count}건 ({db_path})")
+        return count
+    
+    def _get_next_day(self) -> str:
+        """다음 날짜 반환"""
+        from datetime import datetime, timedelta
+        next_day = datetime.strptime(self.today, "%Y-%m-%d") + timedelta(days=1)
+        return next_day.strftime("%Y-%m-%d")
+    
+    def restore_from_artifact(self, artifact: Dict):
+        """저장된 실행 아티팩트로부터 수집 결과 복원"""
+        self.today = artifact['date']
+        self.search_queries = artifact.get('queries') or self.search_queries
+        self.results = artifact['results']
+        self.skipped_queries = artifact.get('skipped', [])
+    
+    def partial_notice(self) -> str:
+        """부분 리포트 안내 문구"""
+        return self.labels['partial'].format(count=len(self.skipped_queries))
+    
+    def _group_by_category(self) -> Dict[str, List[Dict]]:
+        """결과를 카테고리별로 묶기 (정의 순서, 빈 카테고리 제외)
+
+        결과에 'category'가 이미 있으면 그대로 사용 (다이제스트 등)
+        """
+        grouped = {name: [] for name in self.categories}
+        for result in self.results:
+            category = result.get('category') or self._categorize(result['query'])
+            if category:
+                grouped.setdefault(category, []).append(result)
+        return {name: items for name, items in grouped.items() if items}
+    
+    def _build_slack_messages(self) -> List[List[Dict]]:
+        """전체 리포트 슬랙 메시지 (부모 + 후속 메시지, 블록/글자 수 한도에 맞춰 분할)"""
+        blocks = [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": f"🎯 {self.report_title} - {self.today}",
+                    "emoji": True
+                }
+            },
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": self.labels['slack_intro'].format(count=len(self.results)) + (
+                        f"\n⚠️ {self.partial_notice()}: {', '.join(self.skipped_queries)}" if self.skipped_queries else ''
+                    )
+                }
+            },
+            {
+                "type": "divider"
+            }
+        ]
+        
+        for category, items in self._group_by_category().items():
+            blocks.extend(build_category_blocks(category, items, self.labels))
+        
+        blocks.append({
+            "type": "context",
+            "elements": [
+                {
+                    "type": "mrkdwn",
+                    "text": f"📧 {self.labels['see_email']}"
+                }
+            ]
+        })
+        
+        return pack_slack_blocks(blocks)
+    
+    def _post_slack_messages(self, thread: SlackThread, messages: List[List[Dict]]) -> int:
+        """메시지를 순서대로 게시 (부모 실패시 후속 메시지는 보내지 않음), 성공 개수 반환"""
+        sent = 0
+        for blocks in messages:
+            if not thread.post(blocks, f"{self.report_title} - {self.today}"):
+                break
+            sent += 1
+        return sent
+    
+    def send_to_slack_channels(self, channels: Optional[List[str]] = None) -> bool:
+        """봇 토큰으로 채널마다 부모 메시지 + 스레드 후속 메시지 게시 (channels 기본값은 SLACK_CHANNEL)"""
+        messages = self._build_slack_messages()
+        delivered = True
+        for channel in self.slack_channels if channels is None else channels:
+            thread = SlackThread(bot_token=self.slack_bot_token, channel=channel, deadline=self.deadline)
+            sent = self._post_slack_messages(thread, messages)
+            print(f"   {'✅' if sent == len(messages) else '❌'} 슬랙 #{channel}: {sent}/{len(messages)}개 메시지")
+            delivered &= sent == len(messages)
+        return delivered
+    
+    def _render_email_html(self) -> str:
+        """크기 예산 안의 이메일 HTML"""
+        notice = f"{self.partial_notice()}: {', '.join(self.skipped_queries)}" if self.skipped_queries else None
+        html, omitted = pack_email_html(self.report_title, self.today, self._group_by_category(),
+                                        renderer=self.html_renderer, notice=notice)
+        if omitted:
+            print(f"   ✂️  메일 크기 제한으로 {omitted}개 항목은 제목만 표시")
+        return html
@@ -0,0 +1,325 @@
+"""
+Agent CLI
+두 에이전트 모듈이 공유하는 명령행 인터페이스 (run / collect / render / deliver / tenants 등)
+"""
+
+import argparse
+import contextlib
+import os
+import time
+from typing import Callable, List, Optional, Tuple
+
+from run_artifact import build_artifact, save_artifact, load_artifact
+import sharding
+import rollup
+import streaming
+import tenants
+from slack_delivery import build_threads
+from translation import DEFAULT_LOCALE, split_locale
+from insight_store import InsightStore
+from cassette import Cassette
+from deadline import Deadline
+from profiling import RunProfiler
+
+
+def build_parser(description: str) -> argparse.ArgumentParser:
+    """서브커맨드 파서 생성"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('--store', default=None, help='수집 결과를 누적할 인사이트 저장소(SQLite) 경로 (기본값: $INSIGHT_DB_PATH)')
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument('--record', metavar='PATH', default=None, help='Anthropic / Slack / SMTP 통신을 카세트 파일로 녹화')
+    cassette.add_argument('--replay', metavar='PATH', default=None, help='녹화된 카세트로 네트워크 없이 재생')
+    parser.add_argument('--deadline', default=None,
+                        help='실행 마감 - 초(예: 900) / HH:MM(한국 시간) / ISO 시각 (기본값: $RUN_DEADLINE), 지나면 부분 리포트 전송')
+    parser.add_argument('--replay-speed', type=float, default=1.0,
+                        help='재생시 기록된 응답 시간 배율 (1 = 원래 속도, 0.1 = 10배 빠르게, 0 = 대기 없음)')
+    parser.add_argument('--profile', action='store_true',
+                        help='cProfile / tracemalloc로 단계별 시간 · 메모리와 상위 함수 / 할당 위치를 실행 결과 옆에 저장')
+    subparsers = parser.add_subparsers(dest='command')
+
+    subparsers.add_parser('run', help='수집 → 리포트 생성 → 전송을 한 번에 실행 (기본값)')
+    subparsers.add_parser('stream', help='수집하면서 카테고리가 끝날 때마다 슬랙 스레드에 게시, 이메일은 마지막에 전송')
+
+    collect = subparsers.add_parser('collect', help='인사이트 수집 후 결과 아티팩트 저장')
+    collect.add_argument('-o', '--output', default=None, help='결과 아티팩트 경로 (.gz이면 압축, 기본값: run-results.json.gz)')
+    collect.add_argument('--compress', action='store_true', default=None, help='확장자와 관계없이 압축')
+    collect.add_argument('--shard-index', type=int, default=None, help='이 프로세스가 담당할 샤드 번호 (0부터 시작, CI matrix용)')
+    collect.add_argument('--shard-count', type=int, default=None, help='전체 샤드 수')
+    collect.add_argument('--shards', type=int, default=None, help='로컬 프로세스 N개로 샤드 수집 후 바로 병합')
+    collect.add_argument('--partial-dir', default='.', help='샤드 부분 결과를 저장할 디렉토리')
+
+    render = subparsers.add_parser('render', help='결과 아티팩트로 리포트 생성')
+    render.add_argument('-i', '--input', required=True, help='collect 단계 아티팩트 경로')
+    render.add_argument('-o', '--output', default='run-report.json.gz', help='리포트 아티팩트 경로 (.gz이면 압축)')
+    render.add_argument('--compress', action='store_true', default=None, help='확장자와 관계없이 압축')
+
+    merge = subparsers.add_parser('merge', help='샤드 부분 결과를 원래 쿼리 순서대로 병합')
+    merge.add_argument('inputs', nargs='+', help='부분 결과 파일, 디렉토리 또는 글롭 패턴')
+    merge.add_argument('-o', '--output', default='run-results.json.gz', help='병합된 결과 아티팩트 경로')
+    merge.add_argument('--compress', action='store_true', default=None, help='확장자와 관계없이 압축')
+    merge.add_argument('--rerun-missing', action='store_true', help='누락된 샤드만 다시 수집한 뒤 병합')
+    merge.add_argument('--shard-count', type=int, default=None, help='기대하는 전체 샤드 수 (부분 결과가 하나도 없을 때 필요)')
+
+    deliver = subparsers.add_parser('deliver', help='아티팩트의 리포트를 슬랙/이메일로 전송')
+    deliver.add_argument('-i', '--input', required=True, help='render (또는 collect) 단계 아티팩트 경로')
+
+    digest = subparsers.add_parser('digest', help='저장소에 누적된 결과로 주간/월간 다이제스트 생성 후 전송 (새 검색 없음)')
+    digest.add_argument('--period', choices=sorted(rollup.PERIOD_TITLES), default='weekly')
+    digest.add_argument('--date', default=None, help='기간 마지막 날짜 (YYYY-MM-DD, 기본값: 오늘)')
+    digest.add_argument('--no-summary', action='store_true', help='종합 요약(Claude 호출 1회) 생략')
+    digest.add_argument('--dry-run', action='store_true', help='전송하지 않고 리포트만 출력')
+
+    multi = subparsers.add_parser('tenants', help='여러 팀의 쿼리를 중복 없이 한 번 수집하고 팀별 리포트를 각 수신자에게 전송')
+    multi.add_argument('-c', '--config', default=os.getenv('TENANTS_CONFIG', tenants.DEFAULT_TENANTS_PATH),
+                       help='테넌트 설정 파일 (기본값: $TENANTS_CONFIG 또는 tenants.json)')
+    multi.add_argument('--dry-run', action='store_true', help='전송하지 않고 팀별 리포트만 출력')
+
+    return parser
+
+
+def _require_api_key() -> Optional[str]:
+    """API 키 확인"""
+    anthropic_api_key = os.getenv('ANTHROPIC_API_KEY')
+    if not anthropic_api_key:
+        print("⚠️  경고: ANTHROPIC_API_KEY가 설정되지 않았습니다.")
+        print("환경변수를 설정하거나 .env 파일을 확인해주세요.\n")
+    return anthropic_api_key
+
+
+def main(agent_cls, load_delivery: Callable[[], Tuple], description: str, argv: Optional[List[str]] = None) -> int:
+    """공통 진입점 - 종료 코드 반환"""
+    args = build_parser(description).parse_args(argv)
+    command = args.command or 'run'
+
+    # 마감을 절대 시각으로 고정해서 이후에 만드는 에이전트 / 샤드 프로세스가 같은 마감을 공유
+    deadline = Deadline.parse(args.deadline or os.getenv('RUN_DEADLINE'))
+    if deadline.limited:
+        os.environ['RUN_DEADLINE'] = deadline.isoformat()
+
+    if args.record and command == 'collect' and args.shards:
+        print("❌ --record는 --shards(멀티 프로세스)와 함께 쓸 수 없습니다")
+        return 2
+
+    if args.record:
+        cassette = Cassette(args.record, 'record')
+    elif args.replay:
+        cassette = Cassette(args.replay, 'replay', args.replay_speed)
+        # 재생은 실제 API를 호출하지 않으므로 키가 없어도 실행
+        os.environ.setdefault('ANTHROPIC_API_KEY', 'replay')
+    else:
+        cassette = contextlib.nullcontext()
+
+    if args.profile:
+        # 결과 아티팩트가 있는 명령은 그 옆에, 없으면 현재 디렉토리에 저장
+        output = getattr(args, 'output', None) or getattr(args, 'input', None) or ''
+        profiler = RunProfiler(agent_cls, command, os.path.dirname(output) or '.')
+    else:
+        profiler = contextlib.nullcontext()
+
+    with cassette, profiler:
+        return _dispatch(agent_cls, load_delivery, args, command)
+
+
+def _dispatch(agent_cls, load_delivery: Callable[[], Tuple], args, command: str) -> int:
+    """서브커맨드 실행"""
+    if command in ('run', 'collect', 'stream', 'tenants'):
+        anthropic_api_key = _require_api_key()
+        if not anthropic_api_key:
+            return 1
+        agent = agent_cls(anthropic_api_key)
+    else:
+        agent = agent_cls(os.getenv('ANTHROPIC_API_KEY'))
+
+    if args.store:
+        agent.insight_db_path = args.store
+
+    if command == 'run':
+        agent.run(*load_delivery())
+        return 0
+
+    if command == 'stream':
+        return _stream(agent, load_delivery)
+
+    if command == 'tenants':
+        return _tenants(agent_cls, anthropic_api_key, args, load_delivery)
+
+    if command == 'collect' and (args.shards or args.shard_count):
+        return _collect_sharded(agent_cls, agent, anthropic_api_key, args)
+
+    if command == 'digest':
+        return _digest(agent, args, load_delivery)
+
+    if command == 'merge':
+        return _merge(agent_cls, agent, args)
+
+    if command == 'collect':
+        output = args.output or 'run-results.json.gz'
+        started = time.perf_counter()
+        agent.collect_all_insights()
+        elapsed = round(time.perf_counter() - started, 3)
+
+        agent.save_to_store()
+        artifact = build_artifact(agent, 'results', timings={'collect': elapsed})
+        size = save_artifact(artifact, output, args.compress)
+        print(f"💾 결과 저장: {output} ({size:,} bytes, {elapsed}초)")
+        return 0 if agent.results else 1
+
+    artifact = load_artifact(args.input, ['results', 'report'] if command == 'deliver' else ['results'])
+    agent.restore_from_artifact(artifact)
+
+    if command == 'render':
+        started = time.perf_counter()
+        report = agent.generate_comprehensive_report()
+        elapsed = round(time.perf_counter() - started, 3)
+
+        timings = dict(artifact.get('timings', {}), render=elapsed)
+        size = save_artifact(build_artifact(agent, 'report', report, timings), args.output, args.compress)
+        print(f"💾 리포트 저장: {args.output} ({size:,} bytes, {elapsed}초)")
+        return 0
+
+    # deliver
+    report = artifact.get('report') or agent.generate_comprehensive_report()
+    started = time.perf_counter()
+    delivered = agent.deliver(report, *load_delivery())
+    print(f"⏱️  전송 단계: {time.perf_counter() - started:.3f}초")
+    return 0 if delivered else 1
+
+
+def _collect_sharded(agent_cls, agent, anthropic_api_key: str, args) -> int:
+    """샤드 수집 (CI matrix의 단일 샤드 또는 로컬 멀티 프로세스)"""
+    if args.shards:
+        paths = sharding.collect_local_shards(agent_cls, anthropic_api_key, args.shards, args.partial_dir)
+        merged, missing = sharding.merge_partials(sharding.load_partials(paths))
+        return _save_merged(agent, merged, missing, args.shards, args.output or 'run-results.json.gz', args.compress)
+
+    if args.shard_index is None:
+        print("❌ --shard-count에는 --shard-index가 필요합니다")
+        return 2
+
+    output = args.output or sharding.partial_path(args.partial_dir, args.shard_index, args.shard_count)
+    artifact = sharding.collect_shard(agent, args.shard_index, args.shard_count, output)
+    return 0 if artifact['results'] else 1
+
+
+def _merge(agent_cls, agent, args) -> int:
+    """부분 결과 병합 (누락 샤드는 감지 후 선택적으로 재실행)"""
+    paths = sharding.expand_inputs(args.inputs)
+    partials = sharding.load_partials(paths)
+    merged, missing = sharding.merge_partials(partials)
+    shard_count = partials[0]['shard']['count'] if partials else args.shard_count
+
+    if not partials and shard_count:
+        missing = list(range(shard_count))
+    elif args.shard_count and args.shard_count != shard_count:
+        print(f"❌ 샤드 수 불일치: 부분 결과는 {shard_count}개 기준, 기대값은 {args.shard_count}개")
+        return 1
+
+    if missing and args.rerun_missing:
+        anthropic_api_key = _require_api_key()
+        if not anthropic_api_key:
+            return 1
+
+        output_dir = os.path.dirname(paths[0]) if paths else (args.inputs[0] if os.path.isdir(args.inputs[0]) else '.')
+        print(f"🔁 누락된 샤드 재실행: {missing}")
+        paths += sharding.collect_local_shards(agent_cls, anthropic_api_key, shard_count, output_dir, missing)
+        merged, missing = sharding.merge_partials(sharding.load_partials(paths))
+
+    return _save_merged(agent, merged, missing, shard_count, args.output, args.compress)
+
+
+def _save_merged(agent, merged, missing: List[int], shard_count: Optional[int], output: str, compress: Optional[bool]) -> int:
+    """병합 결과 저장 (누락 샤드가 있으면 재실행 방법 안내)"""
+    if missing:
+        print(f"❌ 누락된 샤드: {', '.join(str(i) for i in missing)}")
+        for i in missing:
+            print(f"   재실행: collect --shard-index {i} --shard-count {shard_count}")
+        print("   또는 merge --rerun-missing 으로 누락분만 다시 수집하세요")
+        return 1
+
+    if merged is None:
+        print("❌ 병합할 부분 결과가 없습니다")
+        return 1
+
+    agent.restore_from_artifact(merged)
+    agent.save_to_store()
+
+    size = save_artifact(merged, output, compress)
+    print(f"💾 병합 결과 저장: {output} ({len(merged['results'])}개 인사이트, {size:,} bytes)")
+    return 0
+
+
+def _digest(agent, args, load_delivery: Callable[[], Tuple]) -> int:
+    """주간/월간 롤업 다이제스트 생성 및 전송"""
+    db_path = agent.insight_db_path
+    if not db_path or not os.path.exists(db_path):
+        print("❌ 인사이트 저장소가 없습니다 (--store 또는 INSIGHT_DB_PATH 지정)")
+        return 1
+
+    end_date = args.date or agent.today
+    with InsightStore(db_path) as store:
+        digest = rollup.build_digest(store, args.period, end_date, list(agent.categories))
+
+    if not digest['categories']:
+        print(f"⚠️  {digest['since']} ~ {digest['until']} 기간에 저장된 결과가 없습니다")
+        return 1
+
+    summary = None
+    if not args.no_summary and agent.api_key:
+        print("🧭 종합 요약 생성 중...")
+        summary = rollup.summarize_digest(agent, digest)
+
+    report = rollup.render_digest_report(digest, summary)
+
+    agent.today = digest['until']
+    agent.report_title = digest['title']
+    agent.results = rollup.digest_results(digest, summary)
+
+    if args.dry_run:
+        print(report)
+        return 0
+
+    return 0 if agent.deliver(report, *load_delivery()) else 1
+
+
+def _stream(agent, load_delivery: Callable[[], Tuple]) -> int:
+    """스트리밍 실행: 헤더 즉시 게시 → 카테고리별 스레드 게시 → 이메일 전송"""
+    slack_targets, email_targets = load_delivery()
+    if isinstance(slack_targets, str):
+        slack_targets = [slack_targets]
+
+    # 수집 중 게시는 기본 로케일 수신처만 (다른 로케일은 수집이 끝난 뒤 번역본으로 전송)
+    def by_locale(values: List[str], default: bool) -> List[str]:
+        return [v for v in values if v and v.strip() and (split_locale(v)[1] == DEFAULT_LOCALE) == default]
+
+    live_channels = [split_locale(c)[0] for c in by_locale(agent.slack_channels, True)]
+    threads = build_threads(by_locale(slack_targets or [], True), agent.slack_bot_token, live_channels, agent.deadline)
+
+    streaming.stream_to_slack(agent, threads)
+    agent.save_to_store()
+
+    # 스레드별 게시 실패 (헤더 실패로 건너뛴 메시지 포함)
+    failed = [thread for thread in threads if thread.failures]
+    for thread in failed:
+        print(f"❌ 스트리밍 게시 실패 ({thread.label}): {thread.failures}개 메시지")
+
+    report = agent.generate_comprehensive_report()
+    # 기본 로케일 슬랙은 이미 게시했으므로 나머지 로케일 슬랙과 이메일만 전송
+    agent.slack_channels = by_locale(agent.slack_channels, False)
+    delivered = agent.deliver(report, by_locale(slack_targets or [], False), email_targets)
+    return 0 if delivered and not failed else 1
+
+
+def _tenants(agent_cls, anthropic_api_key: str, args, load_delivery: Callable[..., Tuple]) -> int:
+    """멀티 테넌트 실행 (쿼리 합집합 1회 수집 → 팀별 전송)"""
+    try:
+        tenant_list = tenants.load_tenants(args.config)
+    except (OSError, ValueError) as e:
+        print(f"❌ 테넌트 설정 오류: {e}")
+        return 1
+
+    delivered = tenants.run_tenants(agent_cls, anthropic_api_key, tenant_list, load_delivery, args.store, args.dry_run)
+
+    failed = [name for name, ok in delivered.items() if not ok]
+    if failed:
+        print(f"❌ 전송 실패한 팀: {', '.join(failed)}")
+    return 1 if failed else 0
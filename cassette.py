@@ -0,0 +1,300 @@
+"""
+Cassette
+에이전트의 Anthropic / Slack(requests.post), 근거 자료 출처(requests.get)와 SMTP 통신을 파일로 녹화하고 오프라인으로 재생
+
+- 녹화: 실제로 호출하면서 요청 / 응답 / 소요 시간을 기록
+- 재생: 네트워크 없이 기록된 응답을 원래 속도(speed=1) 또는 압축된 속도(0 < speed < 1, 0이면 즉시)로 반환
+  → 문제 리포트 재현, search_with_claude 이후 단계(리포트 / 렌더링 / 전송) 프로파일링과 회귀 확인용
+
+API 키, 봇 토큰, SMTP 비밀번호는 기록하지 않고, Slack Webhook 주소는 해시로 바꿔서 저장
+"""
+
+import hashlib
+import json
+import re
+import smtplib
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from run_artifact import ARTIFACT_VERSION, save_artifact, load_artifact
+
+
+# 프롬프트 / 메시지의 날짜는 매칭에서 무시 (다른 날 재생해도 같은 요청으로 취급)
+DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# 응답 헤더 중 재생에 필요한 것만 기록
+RECORDED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class CassetteMiss(Exception):
+    """재생할 기록이 없는 요청"""
+
+
+def redact_url(url: str) -> str:
+    """Webhook처럼 경로 자체가 비밀인 주소는 경로를 해시로 대체"""
+    parts = urlsplit(url)
+    if parts.netloc == 'hooks.slack.com':
+        digest = hashlib.sha256(parts.path.encode('utf-8')).hexdigest()[:12]
+        return f"{parts.scheme}://{parts.netloc}/services/{digest}"
+    return url
+
+
+def request_key(kind: str, target: str, payload) -> str:
+    """재생 매칭 키 (날짜를 제외한 요청 내용 기준)"""
+    body = json.dumps(payload, ensure_ascii=False, sort_keys=True)
+    body = DATE_PATTERN.sub('<date>', body)
+    return hashlib.sha256(f"{kind}\n{target}\n{body}".encode('utf-8')).hexdigest()[:16]
+
+
+class RecordedResponse:
+    """재생용 응답 (에이전트가 쓰는 requests.Response 속성만)"""
+
+    def __init__(self, status_code: int, text: str, headers: Optional[Dict] = None):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode('utf-8')
+        self.encoding = 'utf-8'
+        self.headers = CaseInsensitiveDict(headers or {})
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class Cassette:
+    """with 블록 안의 requests.post / requests.get / smtplib.SMTP 호출을 녹화(mode='record')하거나 재생(mode='replay')"""
+
+    def __init__(self, path: str, mode: str, speed: float = 1.0):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"지원하지 않는 모드입니다: {mode}")
+        self.path = path
+        self.mode = mode
+        self.speed = speed
+        self.interactions = []
+        self._lock = threading.Lock()
+        self._started = None
+        self._originals = None
+        self._queues = {}
+        self._unmatched = {}
+
+    def __enter__(self):
+        if self.mode == 'replay':
+            self._load()
+
+        self._originals = (requests.post, requests.get, smtplib.SMTP)
+        self._started = time.perf_counter()
+        if self.mode == 'record':
+            requests.post = self._record_post
+            requests.get = self._record_get
+            smtplib.SMTP = _recording_smtp(self, self._originals[2])
+        else:
+            requests.post = self._replay_post
+            requests.get = self._replay_get
+            smtplib.SMTP = _replaying_smtp(self)
+        return self
+
+    def __exit__(self, *exc):
+        requests.post, requests.get, smtplib.SMTP = self._originals
+        if self.mode == 'record':
+            size = self.save()
+            print(f"📼 녹화 저장: {self.path} ({len(self.interactions)}건, {size:,} bytes)")
+        else:
+            left = sum(len(q) for q in self._queues.values())
+            print(f"📼 재생 완료: {len(self.interactions) - left}/{len(self.interactions)}건 사용")
+        return False
+
+    # 녹화
+
+    def _append(self, interaction: Dict):
+        with self._lock:
+            self.interactions.append(interaction)
+
+    def _record_post(self, url: str, json=None, **kwargs):
+        return self._record("http", redact_url(url), json, lambda: self._originals[0](url, json=json, **kwargs))
+
+    def _record_get(self, url: str, **kwargs):
+        # 조건부 요청 헤더는 캐시 상태에 따라 달라지므로 매칭에서 제외
+        return self._record("get", url, None, lambda: self._originals[1](url, **kwargs))
+
+    def _record(self, kind: str, target: str, payload, send):
+        interaction = {
+            "kind": kind,
+            "key": request_key(kind, target, payload),
+            "url": target,
+            "request": payload,
+            "offset": round(time.perf_counter() - self._started, 3),
+        }
+
+        started = time.perf_counter()
+        try:
+            response = send()
+        except Exception as e:
+            interaction.update(elapsed=round(time.perf_counter() - started, 3), error=f"{type(e).__name__}: {e}")
+            self._append(interaction)
+            raise
+
+        interaction.update(
+            elapsed=round(time.perf_counter() - started, 3),
+            status_code=response.status_code,
+            headers={name: response.headers[name] for name in RECORDED_HEADERS if name in response.headers},
+            body=response.text,
+        )
+        self._append(interaction)
+        return response
+
+    def save(self) -> int:
+        cassette = {
+            "version": ARTIFACT_VERSION,
+            "kind": "cassette",
+            "created_at": datetime.now().isoformat(timespec='seconds'),
+            "interactions": sorted(self.interactions, key=lambda i: i['offset']),
+        }
+        return save_artifact(cassette, self.path)
+
+    # 재생
+
+    def _load(self):
+        self.interactions = load_artifact(self.path, ['cassette'])['interactions']
+        for interaction in self.interactions:
+            self._queues.setdefault(interaction['key'], deque()).append(interaction)
+            self._unmatched.setdefault((interaction['kind'], interaction['url']), deque()).append(interaction)
+
+    def take(self, kind: str, target: str, payload) -> Dict:
+        """요청에 맞는 기록을 꺼내고 기록된 소요 시간만큼 대기
+
+        같은 요청이 없으면 같은 대상의 남은 기록을 순서대로 사용 (프롬프트가 바뀐 경우)
+        """
+        key = request_key(kind, target, payload)
+        with self._lock:
+            interaction = None
+            queue = self._queues.get(key)
+            if queue:
+                interaction = queue.popleft()
+            else:
+                fallback = self._unmatched.get((kind, target))
+                while fallback and interaction is None:
+                    candidate = fallback.popleft()
+                    candidates = self._queues.get(candidate['key'])
+                    if candidates and candidate in candidates:
+                        candidates.remove(candidate)
+                        interaction = candidate
+                if interaction is not None:
+                    print(f"📼 요청 내용이 달라 같은 대상의 다음 기록으로 재생: {target}")
+
+        if interaction is None:
+            raise CassetteMiss(f"재생할 기록이 없습니다: {kind} {target}")
+
+        if self.speed > 0 and interaction.get('elapsed'):
+            time.sleep(interaction['elapsed'] * self.speed)
+        return interaction
+
+    def _replay_post(self, url: str, json=None, **kwargs):
+        return self._replay(self.take("http", redact_url(url), json))
+
+    def _replay_get(self, url: str, **kwargs):
+        return self._replay(self.take("get", url, None))
+
+    @staticmethod
+    def _replay(interaction: Dict) -> RecordedResponse:
+        if interaction.get('error'):
+            raise requests.ConnectionError(f"(재생) {interaction['error']}")
+        return RecordedResponse(interaction['status_code'], interaction['body'], interaction.get('headers'))
+
+
+def _recording_smtp(cassette: Cassette, smtp_cls):
+    """실제 SMTP 세션을 감싸서 단계(starttls / login / send_message)와 오류를 기록"""
+
+    class RecordingSMTP:
+        def __init__(self, host: str = '', port: int = 0, *args, **kwargs):
+            self.target = f"{host}:{port}"
+            self.steps = []
+            self.error = None
+            self.offset = round(time.perf_counter() - cassette._started, 3)
+            self.started = time.perf_counter()
+            self._call('connect', lambda: setattr(self, 'server', smtp_cls(host, port, *args, **kwargs)))
+
+        def _call(self, name: str, action, **detail):
+            self.steps.append(dict(detail, call=name))
+            try:
+                return action()
+            except Exception as e:
+                self.error = {"call": name, "type": type(e).__name__, "message": str(e)}
+                if name == 'connect':
+                    self._save()
+                raise
+
+        def starttls(self, *args, **kwargs):
+            return self._call('starttls', lambda: self.server.starttls(*args, **kwargs))
+
+        def login(self, user: str, password: str):
+            return self._call('login', lambda: self.server.login(user, password), user=user)
+
+        def send_message(self, msg, *args, **kwargs):
+            return self._call('send_message', lambda: self.server.send_message(msg, *args, **kwargs),
+                              to=msg['To'], subject=msg['Subject'], bytes=len(msg.as_bytes()))
+
+        def _save(self):
+            cassette._append({
+                "kind": "smtp",
+                "key": request_key("smtp", self.target, [s for s in self.steps if s['call'] == 'connect']),
+                "url": self.target,
+                "steps": self.steps,
+                "error": self.error,
+                "offset": self.offset,
+                "elapsed": round(time.perf_counter() - self.started, 3),
+            })
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            try:
+                self.server.__exit__(*exc)
+            finally:
+                self._save()
+            return False
+
+    return RecordingSMTP
+
+
+def _replaying_smtp(cassette: Cassette):
+    """기록된 SMTP 세션을 재생 (기록된 단계에서 같은 오류 발생)"""
+
+    class ReplayingSMTP:
+        def __init__(self, host: str = '', port: int = 0, *args, **kwargs):
+            target = f"{host}:{port}"
+            self.session = cassette.take("smtp", target, [{"call": "connect"}])
+            self._step('connect')
+
+        def _step(self, name: str):
+            error = self.session.get('error')
+            if error and error['call'] == name:
+                raise smtplib.SMTPException(f"(재생) {error['type']}: {error['message']}")
+
+        def starttls(self, *args, **kwargs):
+            self._step('starttls')
+
+        def login(self, user: str, password: str):
+            self._step('login')
+
+        def send_message(self, msg, *args, **kwargs):
+            self._step('send_message')
+            return {}
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+    return ReplayingSMTP
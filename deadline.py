@@ -0,0 +1,96 @@
+"""
+Run Deadline
+실행 전체 마감 시각과 호출별 타임아웃
+
+마감은 RUN_DEADLINE (또는 --deadline)으로 지정:
+- 초 단위 숫자 (예: 900 → 지금부터 15분)
+- HH:MM (한국 시간 기준 오늘, 예: 08:55)
+- ISO 시각 (예: 2025-01-06T08:55:00+09:00)
+"""
+
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+
+KST = timezone(timedelta(hours=9))
+
+# 호출 하나의 상한 (초) - 마감이 더 가까우면 남은 시간으로 줄어듦
+API_TIMEOUT = 90
+SLACK_TIMEOUT = 10
+SMTP_TIMEOUT = 30
+
+# 수집은 마감보다 이만큼 먼저 끝내고 남은 시간은 리포트 / 전송에 사용
+DELIVERY_RESERVE = 60
+
+# 번역 등 전송 전 준비 작업은 마감보다 이만큼 먼저 끝내서 Slack / SMTP 호출 시간을 남겨둠
+SEND_RESERVE = 20
+
+
+class DeadlineExceeded(Exception):
+    """마감이 지나서 더 이상 호출하지 않음"""
+
+
+class Deadline:
+    """마감 시각 (expires_at이 None이면 제한 없음)"""
+
+    def __init__(self, expires_at: Optional[float] = None):
+        self.expires_at = expires_at
+
+    @classmethod
+    def parse(cls, value: Optional[str]) -> 'Deadline':
+        """RUN_DEADLINE 형식 해석 (비어 있으면 제한 없음)"""
+        value = (value or '').strip()
+        if not value:
+            return cls()
+
+        if re.fullmatch(r'\d+(\.\d+)?', value):
+            return cls(time.time() + float(value))
+
+        if re.fullmatch(r'\d{1,2}:\d{2}', value):
+            hour, minute = map(int, value.split(':'))
+            at = datetime.now(KST).replace(hour=hour, minute=minute, second=0, microsecond=0)
+            return cls(at.timestamp())
+
+        at = datetime.fromisoformat(value)
+        if at.tzinfo is None:
+            at = at.replace(tzinfo=KST)
+        return cls(at.timestamp())
+
+    @property
+    def limited(self) -> bool:
+        return self.expires_at is not None
+
+    def remaining(self) -> Optional[float]:
+        """남은 시간(초), 제한이 없으면 None"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.time())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def timeout(self, cap: float) -> float:
+        """호출 타임아웃 (cap과 남은 시간 중 작은 값), 이미 지났으면 DeadlineExceeded"""
+        remaining = self.remaining()
+        if remaining is None:
+            return cap
+        if remaining <= 0:
+            raise DeadlineExceeded("실행 마감 시각이 지났습니다")
+        return min(cap, remaining)
+
+    def reserve(self, seconds: float) -> 'Deadline':
+        """seconds만큼 앞당긴 마감 (뒤 단계용 시간 확보)"""
+        if self.expires_at is None:
+            return self
+        return Deadline(self.expires_at - seconds)
+
+    def isoformat(self) -> str:
+        return datetime.fromtimestamp(self.expires_at, KST).isoformat(timespec='milliseconds') if self.limited else ''
+
+    def __str__(self) -> str:
+        if not self.limited:
+            return "제한 없음"
+        return f"{datetime.fromtimestamp(self.expires_at, KST).strftime('%H:%M:%S')} KST (남은 시간 {self.remaining():.0f}초)"
@@ -0,0 +1,204 @@
+"""
+Deep Dive
+넓은 주제를 세부 쿼리로 나눠 동시에 검색(map)하고, 한 번의 호출로 종합(reduce)해서 일반 검색과 같은 결과 형태로 반환
+
+- 세부 쿼리 목록과 세부 쿼리 결과는 각각 따로 캐시 → 겹치는 세부 쿼리는 주제가 달라도 한 번만 검색
+  (같은 실행 안에서 동시에 요청되면 먼저 시작한 검색 결과를 기다려서 공유)
+- 세부 쿼리 결과는 같은 날짜에만, 세부 쿼리 목록은 EXPANSION_KEEP_DAYS 동안 재사용
+
+DEEP_DIVE_QUERIES=디지털 광고 시장 트렌드 2025,retail media 성장
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from json_state import days_between, save_json
+from tenants import query_key
+from wire_schema import schema_prompt, expand
+
+
+SUB_QUERY_COUNT = 4
+MAP_CONCURRENCY = 4
+
+# 세부 쿼리 목록 재사용 기간 (목록이 안정적이어야 날마다 겹치는 세부 쿼리를 공유)
+EXPANSION_KEEP_DAYS = 7
+
+
+class DeepDiveCache:
+    """세부 쿼리 목록 / 세부 쿼리 결과 캐시 (JSON 파일, 스레드 간 공유)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state = {"expansions": {}, "results": {}}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.state.update(json.load(f))
+        self.lock = threading.Lock()
+        self._pending = {}
+
+    def expansion(self, topic: str, today: str) -> Optional[List[str]]:
+        entry = self.state['expansions'].get(query_key(topic))
+        if entry and days_between(entry['date'], today) < EXPANSION_KEEP_DAYS:
+            return entry['sub_queries']
+        return None
+
+    def put_expansion(self, topic: str, sub_queries: List[str], today: str):
+        with self.lock:
+            self.state['expansions'][query_key(topic)] = {"date": today, "sub_queries": sub_queries}
+
+    def result(self, sub_query: str, today: str, search) -> Optional[Dict]:
+        """세부 쿼리 결과 (캐시 → 진행 중인 같은 검색 → 새 검색 순서, 실패는 캐시하지 않음)"""
+        key = query_key(sub_query)
+        with self.lock:
+            entry = self.state['results'].get(key)
+            if entry and entry['date'] == today:
+                return entry['result']
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+
+        if not owner:
+            return future.result()
+
+        result = None
+        try:
+            result = search(sub_query)
+        finally:
+            with self.lock:
+                if result:
+                    self.state['results'][key] = {"date": today, "result": result}
+                del self._pending[key]
+            future.set_result(result)
+        return result
+
+    def save(self, today: str):
+        """오늘 것이 아닌 세부 쿼리 결과는 정리하고 저장"""
+        with self.lock:
+            self.state['results'] = {k: v for k, v in self.state['results'].items() if v['date'] == today}
+            save_json(self.path, self.state)
+
+
+class DeepDive:
+    """선택된 주제의 map-reduce 검색"""
+
+    def __init__(self, topics: List[str], cache_path: str, sub_query_count: int = SUB_QUERY_COUNT,
+                 concurrency: int = MAP_CONCURRENCY):
+        self.topics = {query_key(t) for t in topics}
+        self.cache = DeepDiveCache(cache_path)
+        self.sub_query_count = sub_query_count
+        self.concurrency = concurrency
+
+    @classmethod
+    def from_env(cls) -> Optional['DeepDive']:
+        """DEEP_DIVE_QUERIES가 있으면 생성 (없으면 None → 모든 쿼리 일반 검색)"""
+        topics = [q.strip() for q in os.getenv('DEEP_DIVE_QUERIES', '').split(',') if q.strip()]
+        if not topics:
+            return None
+        return cls(topics, os.getenv('DEEP_DIVE_CACHE_PATH', 'deep_dive_cache.json'),
+                   int(os.getenv('DEEP_DIVE_SUBQUERIES', str(SUB_QUERY_COUNT))),
+                   int(os.getenv('DEEP_DIVE_CONCURRENCY', str(MAP_CONCURRENCY))))
+
+    def selects(self, query: str) -> bool:
+        return query_key(query) in self.topics
+
+    def run(self, agent, topic: str) -> Optional[Dict]:
+        """세부 쿼리로 나누기 → 동시 검색 → 종합 (세부 결과가 하나도 없으면 None)"""
+        sub_queries = self.expand_topic(agent, topic)
+        if not sub_queries:
+            return agent.search_with_claude(topic)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as executor:
+            results = list(executor.map(
+                lambda sub: self.cache.result(sub, agent.today, agent.search_with_claude), sub_queries
+            ))
+        self.cache.save(agent.today)
+
+        found = [r for r in results if r]
+        print(f"   🔬 심층 조사: {topic} - 세부 쿼리 {len(found)}/{len(sub_queries)}개 결과 종합")
+        if not found:
+            return None
+        return self.reduce(agent, topic, found)
+
+    def expand_topic(self, agent, topic: str) -> List[str]:
+        """주제 → 세부 쿼리 목록 (캐시, 실패하면 빈 목록)"""
+        cached = self.cache.expansion(topic, agent.today)
+        if cached:
+            return cached
+
+        prompt = f"""
+다음 광고 시장 주제를 깊이 있게 조사하려고 합니다:
+"{topic}"
+
+서로 겹치지 않는 세부 검색 쿼리 {self.sub_query_count}개로 나눠주세요.
+각 쿼리는 웹 검색에 바로 쓸 수 있는 짧은 한국어 검색어로 작성해주세요.
+
+JSON 문자열 배열로만 응답해주세요 (다른 설명 없이).
+"""
+        try:
+            content = agent._call_claude(prompt, 500, f"세부 쿼리 {topic}")
+            if content is None:
+                return []
+            sub_queries = json.loads(agent._strip_code_block(content))
+        except Exception as e:
+            print(f"   ⚠️  세부 쿼리 생성 실패 ({topic}), 일반 검색으로 진행: {e}")
+            return []
+
+        sub_queries = [q.strip() for q in sub_queries if isinstance(q, str) and q.strip()][:self.sub_query_count]
+        if sub_queries:
+            self.cache.put_expansion(topic, sub_queries, agent.today)
+        return sub_queries
+
+    def reduce(self, agent, topic: str, results: List[Dict]) -> Optional[Dict]:
+        """세부 결과를 한 번의 호출로 종합 (search_with_claude와 같은 결과 형태)"""
+        fields = agent.wire_fields()
+        findings = []
+        for n, result in enumerate(results, 1):
+            lines = [f"[{n}] {result['query']}", f"요약: {result.get('summary', '')}"]
+            lines.extend(f"- {f}" for f in result.get('key_findings') or [])
+            if result.get('impact'):
+                lines.append(f"영향: {result['impact']}")
+            if result.get('actionable_insight'):
+                lines.append(f"액션: {result['actionable_insight']}")
+            if result.get('sources'):
+                lines.append(f"출처: {', '.join(result['sources'])}")
+            findings.append('\n'.join(lines))
+        findings = '\n\n'.join(findings)
+
+        prompt = f"""
+오늘 날짜는 {agent.today}입니다.
+
+"{topic}" 주제를 세부 쿼리로 나눠 조사한 결과입니다:
+
+{findings}
+
+세부 결과를 종합해서 주제 전체에 대한 핵심 인사이트로 정리해주세요.
+겹치는 내용은 합치고, 세부 결과에 없는 내용은 추가하지 마세요.
+
+{schema_prompt(fields)}
+"""
+        try:
+            content = agent._call_claude(prompt, label=f"종합 {topic}")
+            if content is None:
+                return None
+            content = agent._strip_code_block(content)
+            try:
+                wire = json.loads(content)
+            except json.JSONDecodeError:
+                wire = None
+            # 올바른 JSON이라도 객체가 아니면 (배열 등) 파싱 실패와 같이 처리
+            if not isinstance(wire, dict):
+                print(f"JSON 파싱 실패: {topic}")
+                return agent._create_fallback_result(topic, content)
+
+            if 'sources' in fields and not (wire.get('src') or wire.get('sources')):
+                wire['src'] = list(dict.fromkeys(s for r in results for s in r.get('sources') or []))
+            result = expand(wire, topic, fields)
+            result['timestamp'] = agent.today
+            return result
+        except Exception as e:
+            print(f"종합 오류 ({topic}): {e}")
+            return None
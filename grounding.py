@@ -0,0 +1,309 @@
+"""
+Grounding Sources
+설정된 출처(RSS / 플랫폼 변경 공지 / 규제기관 공지 페이지)를 병렬로 가져와서 쿼리 프롬프트에 근거 자료로 첨부
+
+- ETag / Last-Modified 조건부 요청으로 캐시 → 바뀌지 않은 출처는 304 응답으로 끝남
+- 지난번에 본 항목은 해시로 기억해서 새로 나오거나 바뀐 텍스트만 프롬프트에 넣음
+- 본 항목 / ETag는 그 출처를 쓰는 쿼리가 모두 성공한 뒤에만 기록 (실패하면 다음 실행에서 같은 항목을 다시 받음)
+- 길이 제한으로 프롬프트에 들어가지 못한 항목은 본 항목으로 기록하지 않음
+
+출처 설정 파일 (JSON):
+{
+  "sources": [
+    {"name": "Google Ads 공지", "url": "https://.../rss", "keywords": ["구글", "google"]},
+    {"name": "개인정보위 보도자료", "url": "https://.../list", "type": "page", "keywords": ["개인정보"]}
+  ]
+}
+keywords가 쿼리에 들어 있으면 그 쿼리에 첨부 (없으면 모든 쿼리), type은 생략시 응답 내용으로 판단
+"""
+
+import hashlib
+import json
+import os
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+import requests
+
+from deadline import Deadline
+from json_state import save_json
+
+
+SOURCE_TIMEOUT = 15
+FETCH_CONCURRENCY = 8
+
+# 출처 하나에서 한 번에 넘기는 새 항목 수, 쿼리 하나에 붙이는 근거 자료 길이
+MAX_ITEMS_PER_SOURCE = 5
+MAX_ITEM_CHARS = 400
+MAX_CONTEXT_CHARS = 3000
+
+# 출처별로 기억하는 항목 해시 수
+MAX_SEEN = 500
+
+USER_AGENT = "ad-insights-agent/1.0 (+grounding)"
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]
+
+
+def _clean(text: str) -> str:
+    return ' '.join((text or '').split())
+
+
+def _local(tag: str) -> str:
+    """네임스페이스를 뺀 태그 이름"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_feed(body: bytes) -> List[Dict]:
+    """RSS / Atom 항목 추출 (제목, 내용, 링크)"""
+    root = ET.fromstring(body)
+    items = []
+    for node in root.iter():
+        if _local(node.tag) not in ('item', 'entry'):
+            continue
+        fields = {}
+        for child in node:
+            name = _local(child.tag)
+            if name == 'link' and child.get('href'):
+                fields.setdefault('link', child.get('href'))
+            elif name in ('title', 'link', 'description', 'summary', 'content'):
+                fields.setdefault(name, _clean(_TextExtractor.extract(child.text or '')))
+        title = fields.get('title', '')
+        text = fields.get('description') or fields.get('summary') or fields.get('content') or ''
+        if title or text:
+            items.append({"title": title, "text": text, "link": fields.get('link', '')})
+    return items
+
+
+class _TextExtractor(HTMLParser):
+    """본문 블록(문단 / 목록 / 제목) 텍스트만 모으는 간단한 HTML 파서"""
+
+    BLOCKS = {'p', 'li', 'h1', 'h2', 'h3', 'h4', 'td', 'dd'}
+    SKIP = {'script', 'style', 'nav', 'header', 'footer', 'noscript'}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.blocks = []
+        self._current = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag in self.BLOCKS:
+            self._flush()
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP:
+            self._skip = max(0, self._skip - 1)
+        elif tag in self.BLOCKS:
+            self._flush()
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._current.append(data)
+
+    def _flush(self):
+        text = _clean(''.join(self._current))
+        if text:
+            self.blocks.append(text)
+        self._current = []
+
+    @classmethod
+    def extract(cls, html: str) -> str:
+        return ' '.join(cls.blocks_of(html))
+
+    @classmethod
+    def blocks_of(cls, html: str) -> List[str]:
+        parser = cls()
+        parser.feed(html)
+        parser.close()
+        parser._flush()
+        return parser.blocks
+
+
+def parse_page(body: bytes, encoding: Optional[str] = None) -> List[Dict]:
+    """일반 페이지에서 본문 문단 추출 (짧은 메뉴성 텍스트 제외)"""
+    html = body.decode(encoding or 'utf-8', errors='replace')
+    return [{"title": "", "text": block, "link": ""} for block in _TextExtractor.blocks_of(html) if len(block) >= 40]
+
+
+def _is_feed(body: bytes, content_type: str) -> bool:
+    head = body[:200].lstrip().lower()
+    return 'xml' in content_type or head.startswith((b'<?xml', b'<rss', b'<feed'))
+
+
+class SourceCache:
+    """출처별 조건부 요청 헤더와 이미 본 항목 해시 (JSON 파일)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.state = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    def entry(self, url: str) -> Dict:
+        return self.state.setdefault(url, {"seen": []})
+
+    def save(self):
+        save_json(self.path, self.state)
+
+
+class Grounding:
+    """출처 새로고침 → 쿼리별 근거 자료"""
+
+    def __init__(self, sources: List[Dict], cache_path: str, concurrency: int = FETCH_CONCURRENCY):
+        self.sources = sources
+        self.cache = SourceCache(cache_path)
+        self.concurrency = concurrency
+        self.fresh = {}
+        self._pending = {}
+        self._included = {}
+        self._succeeded = set()
+
+    @classmethod
+    def from_env(cls) -> Optional['Grounding']:
+        """GROUNDING_SOURCES가 있으면 생성 (없으면 None → 근거 자료 단계 생략)"""
+        path = os.getenv('GROUNDING_SOURCES')
+        if not path:
+            return None
+        with open(path, encoding='utf-8') as f:
+            sources = json.load(f).get('sources', [])
+        return cls(sources, os.getenv('GROUNDING_CACHE_PATH', 'grounding_cache.json'),
+                   int(os.getenv('GROUNDING_CONCURRENCY', str(FETCH_CONCURRENCY))))
+
+    def refresh(self, deadline: Optional[Deadline] = None) -> Dict[str, List[Dict]]:
+        """모든 출처를 병렬로 조건부 요청, 출처별 새 항목 반환 (캐시 기록은 save()에서)"""
+        deadline = deadline or Deadline()
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as executor:
+            outcomes = list(executor.map(lambda source: self._fetch(source, deadline), self.sources))
+
+        self.fresh = {}
+        self._pending = {}
+        self._included = {}
+        self._succeeded = set()
+        counts = {"new": 0, "unchanged": 0, "error": 0}
+        for source, (status, items, pending) in zip(self.sources, outcomes):
+            counts[status] += 1
+            if items:
+                self.fresh[source['url']] = items
+            if pending:
+                self._pending[source['url']] = pending
+
+        print(f"📰 출처 {len(self.sources)}개 확인: 새 내용 {counts['new']}개 / 변경 없음 {counts['unchanged']}개 / 오류 {counts['error']}개\n")
+        return self.fresh
+
+    def _fetch(self, source: Dict, deadline: Deadline):
+        """출처 하나 조건부 요청 - (상태, 새 항목, 성공 후 기록할 캐시 갱신분) 반환"""
+        url = source['url']
+        entry = self.cache.entry(url)
+        headers = {"User-Agent": USER_AGENT}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+        try:
+            response = requests.get(url, headers=headers, timeout=deadline.timeout(SOURCE_TIMEOUT))
+            entry['checked'] = datetime.now().isoformat(timespec='seconds')
+            if response.status_code == 304:
+                return "unchanged", [], None
+            if response.status_code != 200:
+                print(f"   ⚠️  출처 응답 오류 ({source.get('name', url)}): {response.status_code}")
+                return "error", [], None
+
+            body = response.content
+            content_type = response.headers.get('Content-Type', '')
+            kind = source.get('type') or ('rss' if _is_feed(body, content_type) else 'page')
+            items = parse_feed(body) if kind == 'rss' else parse_page(body, response.encoding)
+        except Exception as e:
+            print(f"   ⚠️  출처 가져오기 실패 ({source.get('name', url)}): {e}")
+            return "error", [], None
+
+        # 이미 본 항목은 제외 (내용이 바뀌면 해시가 달라져 다시 포함)
+        seen = set(entry['seen'])
+        fresh = {}
+        for item in items:
+            key = _hash(f"{item['title']}\n{item['text']}")
+            if key not in seen:
+                fresh.setdefault(key, item)
+        keys = list(fresh)[:MAX_ITEMS_PER_SOURCE]
+
+        # 이번에 넘기지 못한 항목이 남았으면 조건부 헤더를 갱신하지 않음 (다음 실행에서 304 대신 나머지를 받도록)
+        held_back = len(fresh) > len(keys)
+        pending = {
+            "etag": entry.get('etag') if held_back else response.headers.get('ETag'),
+            "last_modified": entry.get('last_modified') if held_back else response.headers.get('Last-Modified'),
+            "seen": keys,
+        }
+        return ("new" if keys else "unchanged"), [dict(fresh[key], key=key) for key in keys], pending
+
+    def record_success(self, query: str):
+        """쿼리가 근거 자료를 받아 성공적으로 끝났음을 기록 (save()에서 사용)"""
+        self._succeeded.add(query)
+
+    def save(self, queries: List[str]):
+        """새 항목을 쓰는 쿼리가 모두 성공한 출처만 본 항목 / 조건부 헤더를 기록하고 캐시 저장
+
+        실패하거나 마감으로 건너뛴 쿼리가 있는 출처는 기록하지 않아서 다음 실행에서 같은 항목을 다시 받음
+        본 항목은 그 출처를 쓰는 모든 쿼리의 프롬프트에 실제로 들어간 것만 기록하고, 빠진 항목이 있으면 조건부 헤더도 갱신하지 않음
+        """
+        for source in self.sources:
+            url = source['url']
+            pending = self._pending.pop(url, None)
+            if pending is None:
+                continue
+            users = [q for q in queries if source in self._sources_for(q)]
+            if self.fresh.get(url) and not all(q in self._succeeded for q in users):
+                continue
+
+            delivered = set(pending['seen'])
+            for query in users:
+                delivered &= self._included.get(query, {}).get(url, set())
+            keys = [key for key in pending['seen'] if key in delivered]
+
+            entry = self.cache.entry(url)
+            if len(keys) == len(pending['seen']):
+                entry['etag'] = pending['etag']
+                entry['last_modified'] = pending['last_modified']
+            entry['seen'] = (entry['seen'] + keys)[-MAX_SEEN:]
+        self.cache.save()
+
+    def _sources_for(self, query: str) -> List[Dict]:
+        query = query.lower()
+        return [s for s in self.sources
+                if not s.get('keywords') or any(k.lower() in query for k in s['keywords'])]
+
+    def has_new(self, query: str) -> bool:
+        """쿼리에 붙일 새 근거 자료가 있는지"""
+        return any(self.fresh.get(s['url']) for s in self._sources_for(query))
+
+    def context_for(self, query: str) -> str:
+        """쿼리 프롬프트에 넣을 근거 자료 텍스트 (새 항목만, 길이 제한)
+
+        실제로 넣은 항목은 쿼리별로 기억해서 save()에서 그 항목만 본 것으로 기록
+        """
+        lines = []
+        used = 0
+        included = {}
+        self._included[query] = included
+        for source in self._sources_for(query):
+            for item in self.fresh.get(source['url'], []):
+                text = item['text'][:MAX_ITEM_CHARS]
+                line = f"- [{source.get('name', source['url'])}] {item['title']}"
+                if text:
+                    line += f" - {text}" if item['title'] else text
+                if item['link']:
+                    line += f" ({item['link']})"
+                if used + len(line) > MAX_CONTEXT_CHARS:
+                    return '\n'.join(lines)
+                lines.append(line)
+                used += len(line)
+                included.setdefault(source['url'], set()).add(item['key'])
+        return '\n'.join(lines)
@@ -0,0 +1,91 @@
+"""
+HTML Renderer
+구조화된 결과(카테고리별 인사이트)를 이메일용 HTML로 렌더링
+템플릿은 모듈 로드시 한 번만 컴파일하고, 모델 출력은 모두 이스케이프해서 삽입
+"""
+
+from html import escape
+from string import Template
+from typing import Dict, List, Optional
+
+from report_labels import LABELS
+
+
+# 미리 컴파일된 템플릿 (스타일은 이메일 클라이언트 호환을 위해 인라인, 컨테이너에만 최소한으로)
+PAGE = Template(
+    '<!DOCTYPE html><html lang="$lang"><head><meta charset="UTF-8"><title>$title</title></head>'
+    '<body style="margin:0;padding:16px;background:#f8f9fa;color:#2c3e50;line-height:1.6;'
+    'font-family:-apple-system,\'Segoe UI\',\'Noto Sans KR\',sans-serif">'
+    '<main style="max-width:760px;margin:0 auto;background:#fff;border-radius:8px;padding:24px">'
+    '<header style="background:#667eea;color:#fff;padding:16px;border-radius:6px;text-align:center">'
+    '<h1 style="margin:0;font-size:20px">🎯 $title</h1>$date</header>'
+    '$body'
+    '<footer style="margin-top:24px;border-top:1px solid #e9ecef;padding-top:12px;text-align:center;color:#6c757d;font-size:13px">'
+    '$footer</footer></main></body></html>'
+)
+SECTION = Template(
+    '<section style="margin-top:16px;border-left:3px solid #667eea;padding-left:12px"><details open>'
+    '<summary style="cursor:pointer;font-size:17px;font-weight:bold;color:#667eea">$category ($count)</summary>'
+    '$items</details></section>'
+)
+ITEM = Template('<article><h3 style="margin:12px 0 4px;font-size:15px">📌 $query$checked</h3><p style="margin:0">$summary</p>$findings$action</article>')
+CHECKED = Template(' <small>($label: $date)</small>')
+FINDINGS = Template('<ul style="margin:4px 0;padding-left:20px">$items</ul>')
+FINDING = Template('<li>$text</li>')
+ACTION = Template('<p style="margin:4px 0">💡 <b>$label:</b> $text</p>')
+NOTICE = Template('<p style="margin:16px 0 0;padding:8px 12px;background:#fff3cd;border-radius:6px">⚠️ $text</p>')
+OMITTED = Template('<section style="color:#6c757d"><p>✂️ $text</p><ul>$items</ul></section>')
+FOOTER = Template('💌 $text<br>Powered by Advanced Ad Insights Agent 🤖')
+
+
+class HtmlReportRenderer:
+    """카테고리별 결과 → HTML (두 에이전트가 공유, labels / lang으로 다른 로케일 리포트도 렌더링)"""
+
+    # 이 렌더러가 화면에 쓰는 결과 필드
+    consumed_fields = ('summary', 'key_findings', 'actionable_insight')
+
+    def __init__(self, max_findings: int = 3, footer: Optional[str] = None,
+                 labels: Optional[Dict[str, str]] = None, lang: str = 'ko'):
+        self.max_findings = max_findings
+        self.labels = labels or LABELS
+        self.lang = lang
+        self.footer = footer or FOOTER.substitute(text=escape(self.labels['email_footer']))
+
+    def render_item(self, item: Dict, compact: bool = False) -> str:
+        """인사이트 하나 (compact이면 요약만)"""
+        findings = action = ''
+        if not compact:
+            found = ''.join(FINDING.substitute(text=escape(f)) for f in (item.get('key_findings') or [])[:self.max_findings])
+            findings = FINDINGS.substitute(items=found) if found else ''
+            action = ACTION.substitute(label=escape(self.labels['action']), text=escape(item['actionable_insight'])) \
+                if item.get('actionable_insight') else ''
+
+        return ITEM.substitute(
+            query=escape(item['query']),
+            checked=CHECKED.substitute(label=escape(self.labels['last_checked']), date=escape(item['last_checked']))
+            if item.get('last_checked') else '',
+            summary=escape(item.get('summary') or ''),
+            findings=findings,
+            action=action,
+        )
+
+    def render_section(self, category: str, items_html: List[str], count: int) -> str:
+        return SECTION.substitute(category=escape(category), count=count, items=''.join(items_html))
+
+    def render_notice(self, text: str) -> str:
+        return NOTICE.substitute(text=escape(text))
+
+    def render_omitted(self, titles: List[str]) -> str:
+        items = ''.join(FINDING.substitute(text=escape(t)) for t in titles)
+        return OMITTED.substitute(text=escape(self.labels['email_omitted'].format(count=len(titles))), items=items)
+
+    def render_page(self, title: str, date: str, body: str) -> str:
+        return PAGE.substitute(lang=self.lang, title=escape(title), date=escape(date), body=body, footer=self.footer)
+
+    def render(self, title: str, date: str, grouped: Dict[str, List[Dict]], compact: bool = False) -> str:
+        """크기 제한 없이 전체 페이지 렌더링"""
+        body = ''.join(
+            self.render_section(category, [self.render_item(item, compact) for item in items], len(items))
+            for category, items in grouped.items()
+        )
+        return self.render_page(title, date, body)
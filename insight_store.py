@@ -0,0 +1,330 @@
+"""
+Insight Store
+매일의 수집 결과를 SQLite에 누적 저장하고 FTS5 전문 검색 제공
+
+사용 예:
+    python insight_store.py search "리테일 미디어 카카오" --first
+    python insight_store.py stats
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+
+DEFAULT_DB_PATH = 'insights.db'
+
+UNCATEGORIZED = "미분류"
+
+# 저장 / 전문 검색 색인에 쓰는 결과 필드
+STORE_FIELDS = ('summary', 'key_findings', 'impact', 'actionable_insight', 'sources')
+
+# 테마 추출시 떼어낼 조사 / 무시할 단어
+PARTICLES = ('으로', '에서', '에게', '까지', '부터', '의', '은', '는', '이', '가', '을', '를', '에', '와', '과', '로', '도')
+STOPWORDS = {'있는', '있습니다', '있음', '위한', '통해', '대한', '관련', '등의', '및', '최근', '기존', '증가', '확대', 'the', 'and', 'for', 'with'}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS insights (
+    id INTEGER PRIMARY KEY,
+    run_date TEXT NOT NULL,
+    query TEXT NOT NULL,
+    category TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    key_findings TEXT NOT NULL DEFAULT '[]',
+    impact TEXT NOT NULL DEFAULT '',
+    actionable_insight TEXT NOT NULL DEFAULT '',
+    sources TEXT NOT NULL DEFAULT '[]',
+    UNIQUE (run_date, query, category)
+);
+
+CREATE INDEX IF NOT EXISTS idx_insights_category_date ON insights (category, run_date);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS insights_fts USING fts5(
+    summary, key_findings, impact, actionable_insight,
+    content='insights', content_rowid='id', tokenize='unicode61'
+);
+
+-- 기간별 롤업용 증분 집계: 결과 하나당 발견사항 / 출처 / 테마 단어를 미리 정규화해서 보관
+CREATE TABLE IF NOT EXISTS insight_aggregates (
+    run_date TEXT NOT NULL,
+    query TEXT NOT NULL,
+    category TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    item_key TEXT NOT NULL,
+    item_text TEXT NOT NULL,
+    PRIMARY KEY (run_date, query, kind, item_key)
+);
+
+CREATE INDEX IF NOT EXISTS idx_aggregates_item ON insight_aggregates (category, kind, item_key, run_date);
+CREATE INDEX IF NOT EXISTS idx_aggregates_date ON insight_aggregates (run_date);
+
+CREATE TRIGGER IF NOT EXISTS insights_ai AFTER INSERT ON insights BEGIN
+    INSERT INTO insights_fts (rowid, summary, key_findings, impact, actionable_insight)
+    VALUES (new.id, new.summary, new.key_findings, new.impact, new.actionable_insight);
+END;
+
+CREATE TRIGGER IF NOT EXISTS insights_ad AFTER DELETE ON insights BEGIN
+    INSERT INTO insights_fts (insights_fts, rowid, summary, key_findings, impact, actionable_insight)
+    VALUES ('delete', old.id, old.summary, old.key_findings, old.impact, old.actionable_insight);
+END;
+
+CREATE TRIGGER IF NOT EXISTS insights_au AFTER UPDATE ON insights BEGIN
+    INSERT INTO insights_fts (insights_fts, rowid, summary, key_findings, impact, actionable_insight)
+    VALUES ('delete', old.id, old.summary, old.key_findings, old.impact, old.actionable_insight);
+    INSERT INTO insights_fts (rowid, summary, key_findings, impact, actionable_insight)
+    VALUES (new.id, new.summary, new.key_findings, new.impact, new.actionable_insight);
+END;
+"""
+
+UPSERT = """
+INSERT INTO insights (run_date, query, category, summary, key_findings, impact, actionable_insight, sources)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (run_date, query, category) DO UPDATE SET
+    summary = excluded.summary,
+    key_findings = excluded.key_findings,
+    impact = excluded.impact,
+    actionable_insight = excluded.actionable_insight,
+    sources = excluded.sources
+"""
+
+
+def normalize_key(text: str) -> str:
+    """비교용 키 (소문자, 문장부호 제거, 공백 정리)"""
+    return ' '.join(re.sub(r'[^\w\s]', ' ', text.lower()).split())
+
+
+def extract_themes(text: str) -> List[str]:
+    """테마 단어 추출 (조사 제거, 짧은 단어 / 불용어 제외)"""
+    themes = []
+    for token in normalize_key(text).split():
+        if len(token) > 2:
+            for particle in PARTICLES:
+                if token.endswith(particle) and len(token) - len(particle) >= 2:
+                    token = token[:-len(particle)]
+                    break
+        if len(token) >= 2 and not token.isdigit() and token not in STOPWORDS:
+            themes.append(token)
+    return themes
+
+
+def extract_aggregate_items(result: Dict) -> List[tuple]:
+    """결과 하나에서 (kind, item_key, item_text) 목록 추출"""
+    items = {}
+    for finding in result.get('key_findings') or []:
+        key = normalize_key(finding)
+        if key:
+            items[('finding', key)] = finding
+        for theme in extract_themes(finding):
+            items.setdefault(('theme', theme), theme)
+    for theme in extract_themes(result.get('summary') or ''):
+        items.setdefault(('theme', theme), theme)
+    for source in result.get('sources') or []:
+        key = normalize_key(re.sub(r'^https?://(www\.)?', '', source).split('/')[0]) if '://' in source else normalize_key(source)
+        if key:
+            items[('source', key)] = source
+    return [(kind, key, text) for (kind, key), text in items.items()]
+
+
+def build_match_expression(text: str) -> str:
+    """검색어를 FTS5 MATCH 식으로 변환
+
+    한국어는 조사가 뒤에 붙으므로 각 단어를 접두어 검색("카카오"* → 카카오의, 카카오는)으로 AND 결합
+    """
+    terms = [term.replace('"', '""') for term in text.split()]
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+class InsightStore:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+        self._backfill_aggregates()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def save_run(self, run_date: str, results: List[Dict], categorize: Callable[[str], Optional[str]]) -> int:
+        """한 번의 실행 결과를 단일 트랜잭션으로 저장 (같은 날짜/쿼리/카테고리는 갱신)"""
+        rows = [
+            (
+                run_date,
+                result['query'],
+                categorize(result['query']) or UNCATEGORIZED,
+                result.get('summary') or '',
+                json.dumps(result.get('key_findings') or [], ensure_ascii=False),
+                result.get('impact') or '',
+                result.get('actionable_insight') or '',
+                json.dumps(result.get('sources') or [], ensure_ascii=False),
+            )
+            for result in results
+        ]
+
+        aggregate_rows = [
+            (run_date, row[1], row[2], kind, key, text)
+            for result, row in zip(results, rows)
+            for kind, key, text in extract_aggregate_items(result)
+        ]
+
+        with self.conn:
+            self.conn.executemany(UPSERT, rows)
+            self.conn.executemany(
+                "DELETE FROM insight_aggregates WHERE run_date = ? AND query = ?",
+                {(run_date, row[1]) for row in rows}
+            )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO insight_aggregates VALUES (?, ?, ?, ?, ?, ?)",
+                aggregate_rows
+            )
+        return len(rows)
+
+    def _backfill_aggregates(self):
+        """집계 테이블 도입 전에 저장된 결과가 있으면 한 번만 집계 생성"""
+        has_aggregates = self.conn.execute("SELECT 1 FROM insight_aggregates LIMIT 1").fetchone()
+        has_insights = self.conn.execute("SELECT 1 FROM insights LIMIT 1").fetchone()
+        if has_aggregates or not has_insights:
+            return
+
+        rows = [
+            (row['run_date'], row['query'], row['category'], kind, key, text)
+            for row in map(self._row_to_dict, self.conn.execute("SELECT * FROM insights"))
+            for kind, key, text in extract_aggregate_items(row)
+        ]
+        with self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO insight_aggregates VALUES (?, ?, ?, ?, ?, ?)", rows)
+
+    def window_aggregates(self, since: str, until: str) -> List[Dict]:
+        """기간 내 카테고리별 항목 빈도 (등장 일수, 최초 등장일 포함)"""
+        rows = self.conn.execute(
+            """
+            SELECT a.category, a.kind, a.item_key, MIN(a.item_text) AS item_text,
+                   COUNT(DISTINCT a.run_date) AS days, COUNT(*) AS hits,
+                   (SELECT MIN(b.run_date) FROM insight_aggregates b
+                    WHERE b.category = a.category AND b.kind = a.kind AND b.item_key = a.item_key) AS first_seen
+            FROM insight_aggregates a
+            WHERE a.run_date BETWEEN ? AND ?
+            GROUP BY a.category, a.kind, a.item_key
+            ORDER BY days DESC, hits DESC
+            """,
+            (since, until)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def search(self, text: str, limit: int = 20, category: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None,
+               first: bool = False, raw: bool = False) -> List[Dict]:
+        """전문 검색 - first이면 오래된 순 (처음 등장한 시점 확인용), 아니면 최신순"""
+        sql = """
+            SELECT i.run_date, i.query, i.category, i.summary, i.key_findings,
+                   i.impact, i.actionable_insight, i.sources,
+                   snippet(insights_fts, -1, '[', ']', '…', 12) AS snippet
+            FROM insights_fts
+            JOIN insights i ON i.id = insights_fts.rowid
+            WHERE insights_fts MATCH ?
+        """
+        params = [text if raw else build_match_expression(text)]
+
+        if category:
+            sql += " AND i.category LIKE ?"
+            params.append(f"%{category}%")
+        if since:
+            sql += " AND i.run_date >= ?"
+            params.append(since)
+        if until:
+            sql += " AND i.run_date <= ?"
+            params.append(until)
+
+        sql += " ORDER BY i.run_date ASC, rank" if first else " ORDER BY i.run_date DESC, rank"
+        sql += " LIMIT ?"
+        params.append(limit)
+
+        rows = self.conn.execute(sql, params).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def results_between(self, since: str, until: str) -> List[Dict]:
+        """기간 내 저장된 결과 (날짜, 카테고리 순)"""
+        rows = self.conn.execute(
+            """
+            SELECT run_date, query, category, summary, key_findings, impact, actionable_insight, sources
+            FROM insights WHERE run_date BETWEEN ? AND ?
+            ORDER BY run_date, id
+            """,
+            (since, until)
+        ).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def stats(self) -> Dict:
+        """저장소 현황"""
+        row = self.conn.execute(
+            "SELECT COUNT(*) AS rows, COUNT(DISTINCT run_date) AS runs, MIN(run_date) AS first, MAX(run_date) AS last FROM insights"
+        ).fetchone()
+        return dict(row)
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict:
+        item = dict(row)
+        item.pop('id', None)
+        item['key_findings'] = json.loads(item['key_findings'])
+        item['sources'] = json.loads(item['sources'])
+        return item
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """저장소 조회 CLI"""
+    parser = argparse.ArgumentParser(description="인사이트 저장소 조회")
+    parser.add_argument('--db', default=os.getenv('INSIGHT_DB_PATH', DEFAULT_DB_PATH), help='SQLite 파일 경로')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    search = subparsers.add_parser('search', help='전문 검색')
+    search.add_argument('text', help='검색어 (공백으로 구분된 단어는 모두 포함되어야 함)')
+    search.add_argument('--category', help='카테고리 이름 일부 (예: 플랫폼)')
+    search.add_argument('--since', help='시작 날짜 (YYYY-MM-DD)')
+    search.add_argument('--until', help='종료 날짜 (YYYY-MM-DD)')
+    search.add_argument('--limit', type=int, default=20)
+    search.add_argument('--first', action='store_true', help='오래된 순 정렬 (처음 등장한 시점)')
+    search.add_argument('--raw', action='store_true', help='검색어를 FTS5 MATCH 식 그대로 사용')
+    search.add_argument('--json', action='store_true', help='JSON으로 출력')
+
+    subparsers.add_parser('stats', help='저장소 현황')
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"❌ 저장소가 없습니다: {args.db}")
+        return 1
+
+    with InsightStore(args.db) as store:
+        if args.command == 'stats':
+            stats = store.stats()
+            print(f"🗄️  {args.db}: {stats['rows']}건 / {stats['runs']}회 실행 ({stats['first']} ~ {stats['last']})")
+            return 0
+
+        started = time.perf_counter()
+        rows = store.search(args.text, args.limit, args.category, args.since, args.until, args.first, args.raw)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        print(json.dumps(rows, ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"🔍 '{args.text}' - {len(rows)}건 ({elapsed_ms:.1f}ms)\n")
+    for row in rows:
+        print(f"📅 {row['run_date']}  {row['category']}  📌 {row['query']}")
+        print(f"   {row['snippet']}\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,21 @@
+"""
+JSON State Files
+캐시 / 스케줄 같은 JSON 상태 파일 저장과 날짜 계산 공용 함수
+"""
+
+import json
+import os
+from datetime import datetime
+
+
+def save_json(path: str, data) -> None:
+    """임시 파일에 쓴 뒤 교체 (중간에 죽어도 기존 파일 유지, 임시 파일은 프로세스별로 따로 사용)"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def days_between(start: str, end: str) -> int:
+    """YYYY-MM-DD 두 날짜 사이의 일수"""
+    return (datetime.strptime(end, "%Y-%m-%d") - datetime.strptime(start, "%Y-%m-%d")).days
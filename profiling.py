@@ -0,0 +1,374 @@
+"""
+Run Profiling
+--profile 실행시 CPU(cProfile)와 메모리(tracemalloc)를 단계별로 기록해서 실행 결과 옆에 리포트로 저장
+
+- 단계 경계(수집 / 저장소 기록 / 리포트 생성 / 전송)마다 시간, 메모리, tracemalloc 스냅샷 기록
+- 동시 수집 작업 스레드도 스레드별 프로파일러로 기록한 뒤 합침
+- 파일 경로는 저장소 / 라이브러리 기준 상대 경로로 줄이고 정렬 순서를 고정해서 실행끼리 비교 가능
+- 같은 명령의 이전 프로파일이 있으면 단계별 시간 / 메모리 변화와 느려진 함수를 출력
+
+profile-<명령>-<날짜>.json           단계별 수치 + 상위 함수 / 할당 위치 (비교용)
+profile-<명령>-<날짜>.hotspots.txt   누적 / 자체 시간 기준 상위 함수
+profile-<명령>-<날짜>.alloc.txt      최종 상위 할당 위치와 단계별 증가분
+"""
+
+import cProfile
+import functools
+import glob
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+# 계측할 에이전트 메서드 → 단계 이름 (run()이 이 순서로 호출)
+STAGES = {
+    'collect_all_insights': 'collect',
+    'save_to_store': 'store',
+    'generate_comprehensive_report': 'render',
+    'deliver': 'deliver',
+}
+
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+TOP_STAGE_ALLOCATIONS = 10
+
+# 이전 프로파일 대비 이 비율 이상 느려지거나 커지면 표시
+REGRESSION_RATIO = 0.2
+
+# 함수 비교는 누적 시간이 이만큼(초) 이상 늘어난 것만 (짧은 함수의 측정 잡음 제외)
+MIN_REGRESSION_S = 0.1
+
+# 대기 시간만 재는 함수 (느려진 함수 비교에서 제외, 대기 시간은 단계 시간으로 비교)
+WAIT_FUNCTIONS = (
+    "<method 'acquire' of '_thread.lock' objects>",
+    "<method 'get' of '_queue.SimpleQueue' objects>",
+    "<built-in method time.sleep>",
+)
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def short_path(filename: str) -> str:
+    """실행 환경마다 달라지는 경로 앞부분 제거 (저장소 상대 경로 / 패키지 경로 / stdlib/...)"""
+    if not filename or filename.startswith('<') or filename == '~':
+        return filename
+    path = os.path.abspath(filename)
+    if path.startswith(REPO_DIR + os.sep):
+        return os.path.relpath(path, REPO_DIR)
+
+    parts = path.split(os.sep)
+    for marker in ('site-packages', 'dist-packages'):
+        if marker in parts:
+            return '/'.join(parts[parts.index(marker) + 1:])
+    match = re.search(r'python3\.\d+/(.*)$', path.replace(os.sep, '/'))
+    return f"stdlib/{match.group(1)}" if match else path
+
+
+def function_key(key) -> str:
+    filename, lineno, name = key
+    if filename == '~':
+        return name
+    return f"{short_path(filename)}:{lineno}({name})"
+
+
+class RunProfiler:
+    """실행 전체 프로파일 (with 블록), 에이전트 클래스 메서드를 감싸서 단계 경계 기록"""
+
+    def __init__(self, agent_cls, command: str, directory: str = '.'):
+        self.agent_cls = agent_cls
+        self.command = command
+        self.directory = directory or '.'
+        self.name = f"profile-{command}-{datetime.now().strftime('%Y-%m-%d')}"
+        self.stages = {}
+        self._originals = {}
+        self._thread_profiles = []
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._overhead = [0.0, 0.0]
+        self._spanning = set()
+
+    def __enter__(self):
+        tracemalloc.start()
+        self._snapshot = tracemalloc.take_snapshot()
+        self._started = (time.perf_counter(), time.process_time())
+        self._thread = threading.get_ident()
+
+        for method, stage in STAGES.items():
+            # 베이스 클래스에서 상속받은 메서드는 끝난 뒤 감싼 것만 지우면 원래대로 돌아감
+            self._originals[method] = self.agent_cls.__dict__.get(method)
+            setattr(self.agent_cls, method, self._staged(stage, getattr(self.agent_cls, method)))
+
+        self._profile = cProfile.Profile()
+        # 3.12부터는 프로파일러 하나가 모든 스레드를 기록, 그 전에는 스레드마다 따로 켬
+        if sys.version_info < (3, 12):
+            threading.setprofile(self._profile_thread)
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._profile.disable()
+        threading.setprofile(None)
+        for method, original in self._originals.items():
+            if original is None:
+                delattr(self.agent_cls, method)
+            else:
+                setattr(self.agent_cls, method, original)
+
+        # 단계 경계 스냅샷에 걸린 시간은 전체 시간에서 뺌
+        wall = time.perf_counter() - self._started[0] - self._overhead[0]
+        cpu = time.process_time() - self._started[1] - self._overhead[1]
+        peak = tracemalloc.get_traced_memory()[1]
+        snapshot = self._take_snapshot()
+        tracemalloc.stop()
+
+        report = {
+            "name": self.name,
+            "command": self.command,
+            "python": sys.version.split()[0],
+            "total": {"wall_s": round(wall, 3), "cpu_s": round(cpu, 3), "mem_peak_kb": round(peak / 1024, 1)},
+            "stages": self.stages,
+            "functions": self._function_stats(),
+            "allocations": self._top_allocations(snapshot.statistics('lineno'), TOP_ALLOCATIONS),
+        }
+        self._write(report)
+        return False
+
+    def _profile_thread(self, frame, event, arg):
+        """새 스레드의 첫 이벤트에서 그 스레드 전용 프로파일러 시작"""
+        profile = cProfile.Profile()
+        with self._lock:
+            self._thread_profiles.append(profile)
+        profile.enable()
+
+    def _staged(self, stage: str, func):
+        """단계 메서드 래퍼 (다른 단계 안에서 불린 호출은 바깥 단계에 포함)"""
+        profiler = self
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if profiler._depth:
+                return func(*args, **kwargs)
+            profiler._depth += 1
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            started = (time.perf_counter(), time.process_time())
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler._depth -= 1
+                profiler._end_stage(stage, started, before)
+
+        return wrapper
+
+    def _end_stage(self, stage: str, started, before: int):
+        # 스냅샷 비용이 단계 시간에 들어가지 않도록 먼저 측정
+        wall = time.perf_counter() - started[0]
+        cpu = time.process_time() - started[1]
+        current, peak = tracemalloc.get_traced_memory()
+        diffs = self._paused(self._stage_allocations)
+
+        entry = self.stages.setdefault(stage, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                                "mem_net_kb": 0.0, "mem_peak_kb": 0.0, "allocations": []})
+        entry['calls'] += 1
+        entry['wall_s'] = round(entry['wall_s'] + wall, 3)
+        entry['cpu_s'] = round(entry['cpu_s'] + cpu, 3)
+        entry['mem_net_kb'] = round(entry['mem_net_kb'] + (current - before) / 1024, 1)
+        entry['mem_peak_kb'] = max(entry['mem_peak_kb'], round((peak - before) / 1024, 1))
+
+        # 같은 단계가 여러 번 불리면 (테넌트별 리포트 등) 위치별 증가분 합산
+        merged = {a['where']: a for a in entry['allocations']}
+        for diff in diffs:
+            if diff['where'] in merged:
+                merged[diff['where']]['size_kb'] = round(merged[diff['where']]['size_kb'] + diff['size_kb'], 1)
+                merged[diff['where']]['count'] += diff['count']
+            else:
+                merged[diff['where']] = diff
+        entry['allocations'] = sorted(merged.values(), key=lambda a: (-a['size_kb'], a['where']))[:TOP_STAGE_ALLOCATIONS]
+
+    def _stage_allocations(self) -> List[Dict]:
+        """새 스냅샷을 찍고 직전 스냅샷 대비 증가한 할당 위치"""
+        previous = self._snapshot
+        self._snapshot = self._take_snapshot()
+        return self._top_allocations(self._snapshot.compare_to(previous, 'lineno'), TOP_STAGE_ALLOCATIONS, diff=True)
+
+    def _paused(self, func):
+        """프로파일러를 멈추고 func 실행 (스냅샷 비용이 함수 통계 / 전체 시간에 들어가지 않도록)
+
+        멈추면 그 시점에 열려 있던 바깥 함수(run 등)의 누적 시간이 잘리므로 함수 통계에서는 빼고
+        단계 표로만 보여줌
+        """
+        # 3.12 전에는 스레드마다 프로파일러가 따로라 메인 프로파일러를 켠 스레드에서만 멈출 수 있음
+        pause = sys.version_info >= (3, 12) or threading.get_ident() == self._thread
+        if pause:
+            self._profile.disable()
+            frame = sys._getframe(1)
+            while frame is not None:
+                code = frame.f_code
+                self._spanning.add((code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+
+        started = (time.perf_counter(), time.process_time())
+        try:
+            return func()
+        finally:
+            self._overhead[0] += time.perf_counter() - started[0]
+            self._overhead[1] += time.process_time() - started[1]
+            if pause:
+                self._profile.enable()
+
+    @staticmethod
+    def _take_snapshot():
+        """프로파일러 / tracemalloc 자체 할당은 뺀 스냅샷"""
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+        ))
+
+    @staticmethod
+    def _top_allocations(statistics, limit: int, diff: bool = False) -> List[Dict]:
+        rows = []
+        for stat in statistics:
+            size = stat.size_diff if diff else stat.size
+            if diff and size <= 0:
+                continue
+            frame = stat.traceback[0]
+            rows.append({
+                "where": f"{short_path(frame.filename)}:{frame.lineno}",
+                "size_kb": round(size / 1024, 1),
+                "count": stat.count_diff if diff else stat.count,
+            })
+        return sorted(rows, key=lambda r: (-r['size_kb'], r['where']))[:limit]
+
+    def _function_stats(self) -> List[Dict]:
+        """메인 + 작업 스레드 프로파일 합산, 누적 / 자체 시간 상위 함수 (중복 제거)"""
+        stats = pstats.Stats(self._profile)
+        for profile in self._thread_profiles:
+            stats.add(profile)
+
+        rows = {}
+        for key, (_, calls, tottime, cumtime, _) in stats.stats.items():
+            # 프로파일러 자신(단계 래퍼 / 스냅샷)과 단계 경계에 걸친 바깥 함수는 제외
+            if key[0] == __file__ or key in self._spanning:
+                continue
+            name = function_key(key)
+            row = rows.setdefault(name, {"function": name, "calls": 0, "tottime_s": 0.0, "cumtime_s": 0.0})
+            row['calls'] += calls
+            row['tottime_s'] += tottime
+            row['cumtime_s'] += cumtime
+
+        for row in rows.values():
+            row['tottime_s'] = round(row['tottime_s'], 4)
+            row['cumtime_s'] = round(row['cumtime_s'], 4)
+
+        by_cumulative = sorted(rows.values(), key=lambda r: (-r['cumtime_s'], r['function']))[:TOP_FUNCTIONS]
+        by_internal = sorted(rows.values(), key=lambda r: (-r['tottime_s'], r['function']))[:TOP_FUNCTIONS]
+        selected = {r['function']: r for r in by_cumulative + by_internal}
+        return sorted(selected.values(), key=lambda r: (-r['cumtime_s'], r['function']))
+
+    def _write(self, report: Dict):
+        os.makedirs(self.directory, exist_ok=True)
+        base = os.path.join(self.directory, self.name)
+
+        # 덮어쓰기 전에 같은 명령의 가장 최근 프로파일을 비교 기준으로
+        baseline_path = latest_profile(self.directory, self.command)
+        baseline = None
+        if baseline_path:
+            with open(baseline_path, encoding='utf-8') as f:
+                baseline = json.load(f)
+
+        with open(f"{base}.json", 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        with open(f"{base}.hotspots.txt", 'w', encoding='utf-8') as f:
+            f.write(format_hotspots(report))
+        with open(f"{base}.alloc.txt", 'w', encoding='utf-8') as f:
+            f.write(format_allocations(report))
+
+        total = report['total']
+        print(f"\n🔬 프로파일 저장: {base}.json / .hotspots.txt / .alloc.txt")
+        print(f"   전체 {total['wall_s']}초 (CPU {total['cpu_s']}초), 최대 메모리 {total['mem_peak_kb']:,} KB")
+        if baseline:
+            lines = compare_profiles(baseline, report)
+            print(f"📈 이전 프로파일 대비 ({os.path.basename(baseline_path)}):")
+            for line in lines or ["   변화 없음 (기준 이내)"]:
+                print(line)
+
+
+def latest_profile(directory: str, command: str) -> Optional[str]:
+    """디렉토리에서 같은 명령의 가장 최근 프로파일 JSON (파일 이름의 날짜 기준)"""
+    paths = sorted(glob.glob(os.path.join(directory, f"profile-{command}-*.json")))
+    return paths[-1] if paths else None
+
+
+def _stage_table(stages: Dict) -> List[str]:
+    lines = [f"{'stage':<10}{'calls':>6}{'wall_s':>10}{'cpu_s':>10}{'mem_net_kb':>13}{'mem_peak_kb':>13}"]
+    for name in list(STAGES.values()) + sorted(set(stages) - set(STAGES.values())):
+        if name in stages:
+            s = stages[name]
+            lines.append(f"{name:<10}{s['calls']:>6}{s['wall_s']:>10.3f}{s['cpu_s']:>10.3f}"
+                         f"{s['mem_net_kb']:>13.1f}{s['mem_peak_kb']:>13.1f}")
+    return lines
+
+
+def format_hotspots(report: Dict) -> str:
+    total = report['total']
+    lines = [
+        f"# {report['name']} (python {report['python']})",
+        f"# total wall {total['wall_s']:.3f}s cpu {total['cpu_s']:.3f}s peak {total['mem_peak_kb']:.1f}KB",
+        "",
+        "== stages ==",
+        *_stage_table(report['stages']),
+    ]
+    for title, field in (("cumulative time", 'cumtime_s'), ("internal time", 'tottime_s')):
+        rows = sorted(report['functions'], key=lambda r: (-r[field], r['function']))[:TOP_FUNCTIONS]
+        lines += ["", f"== top by {title} ==", f"{'calls':>9}{'tottime_s':>11}{'cumtime_s':>11}  function"]
+        lines += [f"{r['calls']:>9}{r['tottime_s']:>11.4f}{r['cumtime_s']:>11.4f}  {r['function']}" for r in rows]
+    return '\n'.join(lines) + '\n'
+
+
+def format_allocations(report: Dict) -> str:
+    lines = [f"# {report['name']} - top allocations (tracemalloc, lineno)", "", "== live at end of run =="]
+    lines += [f"{a['size_kb']:>10.1f} KB {a['count']:>8}  {a['where']}" for a in report['allocations']]
+    for name, stage in report['stages'].items():
+        lines += ["", f"== growth during {name} =="]
+        lines += [f"{a['size_kb']:>+10.1f} KB {a['count']:>+8}  {a['where']}" for a in stage['allocations']]
+    return '\n'.join(lines) + '\n'
+
+
+def _change(old: float, new: float) -> str:
+    if not old:
+        return "신규"
+    return f"{(new - old) / old:+.0%}"
+
+
+def compare_profiles(old: Dict, new: Dict) -> List[str]:
+    """단계별 시간 / 메모리, 함수별 누적 시간이 기준 이상 늘어난 항목 (출력용 문장)"""
+    lines = []
+    for name, stage in new['stages'].items():
+        before = old['stages'].get(name)
+        if not before:
+            continue
+        for field, label, unit in (('wall_s', '시간', '초'), ('cpu_s', 'CPU', '초'), ('mem_peak_kb', '최대 메모리', ' KB')):
+            if before[field] and stage[field] > before[field] * (1 + REGRESSION_RATIO):
+                lines.append(f"   ⚠️  {name} {label}: {before[field]}{unit} → {stage[field]}{unit} ({_change(before[field], stage[field])})")
+
+    old_functions = {r['function']: r for r in old['functions']}
+    slower = []
+    for row in new['functions']:
+        before = old_functions.get(row['function'])
+        if row['function'] in WAIT_FUNCTIONS:
+            continue
+        if before and row['cumtime_s'] - before['cumtime_s'] >= MIN_REGRESSION_S \
+                and row['cumtime_s'] > before['cumtime_s'] * (1 + REGRESSION_RATIO):
+            slower.append((row['cumtime_s'] - before['cumtime_s'], row, before))
+    for _, row, before in sorted(slower, key=lambda s: (-s[0], s[1]['function']))[:5]:
+        lines.append(f"   🐢 {row['function']}: {before['cumtime_s']}초 → {row['cumtime_s']}초 ({_change(before['cumtime_s'], row['cumtime_s'])})")
+    return lines
@@ -0,0 +1,126 @@
+"""
+Query Scheduler
+쿼리별로 결과가 얼마나 자주 바뀌는지(novelty)를 추적해서 갱신 주기를 조정
+자주 바뀌는 주제는 매일, 안정적인 주제는 최대 max_interval일마다 검색하고 그 사이에는 마지막 결과를 재사용
+"""
+
+import fcntl
+import json
+import os
+import re
+from typing import Dict, Optional
+
+from insight_store import extract_themes
+from json_state import days_between, save_json
+
+
+# novelty 보정값 (test_query_scheduler.py의 보정 세트로 확인)
+# 같은 상태를 다르게 표현한 요약(패러프레이즈)끼리도 거리가 0.5~0.85 정도 나오고, 이전 내용에 새 전개가 붙으면 0.45~0.85
+# PARAPHRASE_NOISE 이하의 차이만 변화로 보지 않고, RESET_THRESHOLD 이상(내용이 대부분 바뀜)이면 바로 매일 확인으로 복귀
+PARAPHRASE_NOISE = 0.45
+RESET_THRESHOLD = 0.88
+
+
+class QueryScheduler:
+    def __init__(self, state_path: str, min_interval: int = 1, max_interval: int = 7, smoothing: float = 0.5):
+        self.state_path = state_path
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.smoothing = smoothing
+        self.state = self._load()
+        self._updated = set()
+
+    def _load(self) -> Dict:
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path, encoding='utf-8') as f:
+            return json.load(f)
+
+    def save(self):
+        """변경된 쿼리만 덮어써서 저장 (샤드 프로세스끼리 서로의 갱신을 지우지 않도록)
+
+        읽기 → 병합 → 쓰기를 잠금 파일로 묶음
+        """
+        if not self._updated:
+            return
+
+        with open(f"{self.state_path}.lock", 'w') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            state = self._load()
+            for query in self._updated:
+                state[query] = self.state[query]
+            save_json(self.state_path, state)
+        self._updated.clear()
+
+    def is_due(self, query: str, today: str) -> bool:
+        """오늘 검색해야 하는지 (처음 보는 쿼리이거나 갱신 주기가 지났으면 True)"""
+        entry = self.state.get(query)
+        if not entry or not entry.get('last_result'):
+            return True
+        return days_between(entry['last_checked'], today) >= entry['interval']
+
+    def cached_result(self, query: str) -> Dict:
+        """마지막 결과 재사용 ('last_checked' 표시 포함)"""
+        entry = self.state[query]
+        result = dict(entry['last_result'])
+        result['last_checked'] = entry['last_checked']
+        return result
+
+    def record(self, query: str, result: Dict, today: str):
+        """새 결과 반영 - 이전 결과와의 차이로 novelty와 다음 갱신 주기 계산"""
+        entry = self.state.get(query)
+
+        if entry and entry.get('last_result'):
+            change = novelty(entry['last_result'], result)
+            # 패러프레이즈 수준의 차이는 0으로 보고 나머지를 0~1로 다시 맞춤
+            signal = max(0.0, change - PARAPHRASE_NOISE) / (1 - PARAPHRASE_NOISE)
+            score = self.smoothing * signal + (1 - self.smoothing) * entry['novelty']
+        else:
+            change = score = 1.0
+
+        if change >= RESET_THRESHOLD:
+            # 크게 바뀌었으면 바로 매일 확인으로 복귀
+            interval = self.min_interval
+        else:
+            interval = round(self.min_interval / max(score, 1e-6))
+
+        self.state[query] = {
+            "last_checked": today,
+            "interval": max(self.min_interval, min(self.max_interval, interval)),
+            "novelty": round(score, 4),
+            "checks": (entry or {}).get('checks', 0) + 1,
+            "last_result": result,
+        }
+        self._updated.add(query)
+
+    def interval(self, query: str) -> Optional[int]:
+        entry = self.state.get(query)
+        return entry['interval'] if entry else None
+
+
+def novelty(previous: Dict, current: Dict) -> float:
+    """두 결과의 테마 어간 집합 Jaccard 거리 (0: 동일, 1: 완전히 다름)
+
+    표현이 바뀌어도 같은 내용이면 겹치도록 어간으로 비교하고, 매번 나오는 쿼리 자체의 단어는 제외
+    이전 내용을 유지한 채 새 전개만 붙은 결과도 새 테마만큼 거리가 생기도록 합집합 기준으로 계산
+    """
+    topic = {_stem(theme) for theme in extract_themes(current.get('query') or previous.get('query') or '')}
+    before = _theme_set(previous) - topic
+    after = _theme_set(current) - topic
+    if not before and not after:
+        return 0.0
+    if not before or not after:
+        return 1.0
+    return 1 - len(before & after) / len(before | after)
+
+
+def _theme_set(result: Dict) -> set:
+    text = ' '.join([result.get('summary') or ''] + list(result.get('key_findings') or []))
+    return {_stem(theme) for theme in extract_themes(text)}
+
+
+def _stem(theme: str) -> str:
+    """한글 단어는 앞 두 음절만 사용 (마련 중 / 마련하고, 강화될 / 강화 같은 활용형 차이 제거)"""
+    if re.search('[가-힣]', theme):
+        return theme[:2]
+    return theme
@@ -0,0 +1,25 @@
+"""
+Report Labels
+리포트 / 슬랙 / 이메일에 들어가는 고정 문구 (기본 한국어)
+
+다른 로케일 수신자용 리포트는 이 문구도 결과와 함께 번역해서 사용 (translation.py)
+{count} 같은 자리표시자는 번역 후에도 그대로 유지되어야 함
+"""
+
+
+LABELS = {
+    'greeting': "안녕하세요! 오늘의 광고 시장 핵심 인사이트를 정리했습니다.",
+    'last_checked': "마지막 확인",
+    'key_points': "핵심 포인트",
+    'action': "액션 아이템",
+    'overview': "오늘의 종합 인사이트",
+    'collected': "수집된 인사이트: {count}건",
+    'next_brief': "다음 브리핑",
+    'feedback': "피드백이나 추가로 모니터링하고 싶은 주제가 있다면 알려주세요!",
+    'slack_intro': "*{count}개*의 핵심 인사이트를 수집했습니다!",
+    'see_email': "전체 리포트는 이메일을 확인해주세요!",
+    'partial': "부분 리포트: 실행 마감으로 {count}개 주제를 건너뛰었습니다",
+    'partial_subject': "[부분]",
+    'email_omitted': "메일 크기 제한으로 {count}개 항목은 제목만 표시합니다 (전체 내용은 텍스트 버전을 확인해주세요)",
+    'email_footer': "매일 아침 최신 광고 시장 인사이트를 받아보세요",
+}
@@ -0,0 +1,100 @@
+"""
+Report Packing
+리포트 크기와 관계없이 슬랙 / 이메일 한도 안에 들어가도록 나누고 줄이는 계층
+
+- 슬랙: 메시지당 블록 50개, 섹션 텍스트 3000자 제한 → 부모 메시지 + 후속(스레드) 메시지로 분할
+- 이메일: Gmail은 HTML 본문이 약 102KB를 넘으면 잘라서 보여줌 → HtmlReportRenderer 조각으로 예산 안에서 조립
+"""
+
+from html import escape
+from typing import Dict, List, Optional, Tuple
+
+from html_renderer import HtmlReportRenderer
+from slack_delivery import SECTION_TEXT_LIMIT, section, split_text
+
+
+SLACK_MAX_BLOCKS = 50
+# 블록 텍스트 합계 (Slack 메시지 페이로드 한도보다 넉넉히 낮게)
+SLACK_MAX_MESSAGE_CHARS = 12000
+
+# Gmail 클리핑 기준(102KB)보다 MIME 헤더 / 텍스트 파트 여유를 두고 낮게
+EMAIL_HTML_BUDGET = 90_000
+
+
+def _block_chars(block: Dict) -> int:
+    text = block.get('text')
+    if isinstance(text, dict):
+        return len(text.get('text', ''))
+    return sum(len(e.get('text', '')) for e in block.get('elements', []))
+
+
+def pack_slack_blocks(blocks: List[Dict], max_blocks: int = SLACK_MAX_BLOCKS,
+                      max_chars: int = SLACK_MAX_MESSAGE_CHARS) -> List[List[Dict]]:
+    """블록 목록을 한도를 지키는 메시지 목록으로 분할 (첫 메시지가 부모)
+
+    긴 섹션은 여러 섹션으로 나누고, 카테고리 제목(섹션 + 구분선)이 메시지 끝에 홀로 남지 않도록 다음 메시지로 넘김
+    """
+    expanded = []
+    for block in blocks:
+        if block.get('type') == 'section' and _block_chars(block) > SECTION_TEXT_LIMIT:
+            expanded.extend(section(chunk) for chunk in split_text(block['text']['text']))
+        else:
+            expanded.append(block)
+
+    messages, current, chars = [], [], 0
+    for block in expanded:
+        size = _block_chars(block)
+        if current and (len(current) >= max_blocks or chars + size > max_chars):
+            carry = []
+            if current[-1].get('type') == 'divider' and len(current) > 2:
+                carry = current[-2:]
+                current = current[:-2]
+            messages.append(current)
+            current, chars = carry, sum(_block_chars(b) for b in carry)
+        current.append(block)
+        chars += size
+    if current:
+        messages.append(current)
+    return messages
+
+
+def pack_email_html(title: str, today: str, grouped: Dict[str, List[Dict]],
+                    budget: int = EMAIL_HTML_BUDGET, renderer: Optional[HtmlReportRenderer] = None,
+                    notice: Optional[str] = None) -> Tuple[str, int]:
+    """예산(바이트) 안에서 이메일 HTML 생성 - (html, 생략된 항목 수) 반환
+
+    1) 전체 내용이 들어가면 그대로, 2) 아니면 요약만 남긴 compact 형식,
+    3) 그래도 넘치면 들어가는 만큼만 넣고 나머지는 제목 목록으로 (전체 내용은 텍스트 파트에 있음)
+    notice는 본문 맨 위의 안내 문구 (부분 리포트 등)
+    """
+    renderer = renderer or HtmlReportRenderer()
+    head = renderer.render_notice(notice) if notice else ''
+    shell = renderer.render_page(title, today, head)
+    remaining = budget - len(shell.encode('utf-8'))
+
+    for compact in (False, True):
+        rendered = {c: [renderer.render_item(item, compact) for item in items] for c, items in grouped.items()}
+        body = ''.join(renderer.render_section(c, rendered[c], len(items)) for c, items in grouped.items())
+        if len(body.encode('utf-8')) <= remaining:
+            return renderer.render_page(title, today, head + body), 0
+
+    # 항목 단위로 예산이 찰 때까지 채우기 (각 항목 크기는 한 번씩만 계산)
+    omitted_titles = []
+    sections = []
+    # 생략 목록용 여유 (모든 항목이 생략되는 경우의 상한)
+    reserve = 400 + sum(len(escape(item['query']).encode('utf-8')) + 9 for items in grouped.values() for item in items)
+    used = 0
+    for category, items in grouped.items():
+        kept = []
+        for item, html in zip(items, rendered[category]):
+            size = len(html.encode('utf-8'))
+            if not omitted_titles and used + size <= remaining - reserve:
+                kept.append(html)
+                used += size
+            else:
+                omitted_titles.append(item['query'])
+        if kept:
+            sections.append(renderer.render_section(category, kept, len(items)))
+
+    body = head + ''.join(sections) + renderer.render_omitted(omitted_titles)
+    return renderer.render_page(title, today, body), len(omitted_titles)
@@ -0,0 +1,195 @@
+"""
+Rollup Digests
+인사이트 저장소에 누적된 일간 결과로 주간 / 월간 다이제스트 생성 (새 검색 없이)
+"""
+
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from insight_store import InsightStore
+
+
+PERIOD_TITLES = {
+    'weekly': "광고 시장 Weekly Digest",
+    'monthly': "광고 시장 Monthly Digest",
+}
+
+TOP_FINDINGS = 5
+TOP_SOURCES = 5
+TOP_THEMES = 8
+
+
+def period_range(period: str, end_date: str) -> Tuple[str, str]:
+    """다이제스트 기간 (weekly: 최근 7일, monthly: 해당 월 1일부터)"""
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    if period == 'weekly':
+        start = end - timedelta(days=6)
+    elif period == 'monthly':
+        start = end.replace(day=1)
+    else:
+        raise ValueError(f"지원하지 않는 기간입니다: {period}")
+    return start.strftime("%Y-%m-%d"), end_date
+
+
+def build_digest(store: InsightStore, period: str, end_date: str, category_order: Optional[List[str]] = None) -> Dict:
+    """저장소 집계로 카테고리별 다이제스트 데이터 생성"""
+    since, until = period_range(period, end_date)
+
+    results = store.results_between(since, until)
+    aggregates = store.window_aggregates(since, until)
+
+    categories = {}
+    for result in results:
+        section = categories.setdefault(result['category'], {
+            "results": 0, "days": set(), "queries": [],
+            "findings": [], "sources": [], "new_themes": [], "persistent_themes": [],
+        })
+        section['results'] += 1
+        section['days'].add(result['run_date'])
+        if result['query'] not in section['queries']:
+            section['queries'].append(result['query'])
+
+    for item in aggregates:
+        section = categories.get(item['category'])
+        if section is None:
+            continue
+        if item['kind'] == 'finding':
+            section['findings'].append(item)
+        elif item['kind'] == 'source' and item['days'] >= 2:
+            section['sources'].append(item)
+        elif item['kind'] == 'theme':
+            if item['first_seen'] >= since:
+                section['new_themes'].append(item)
+            else:
+                section['persistent_themes'].append(item)
+
+    for section in categories.values():
+        section['days'] = len(section['days'])
+        section['findings'] = section['findings'][:TOP_FINDINGS]
+        section['sources'] = section['sources'][:TOP_SOURCES]
+        section['new_themes'] = [t for t in section['new_themes'] if t['days'] >= 2][:TOP_THEMES] or section['new_themes'][:TOP_THEMES]
+        section['persistent_themes'] = section['persistent_themes'][:TOP_THEMES]
+
+    order = list(category_order or []) + sorted(c for c in categories if c not in (category_order or []))
+    return {
+        "period": period,
+        "title": PERIOD_TITLES[period],
+        "since": since,
+        "until": until,
+        "runs": len({r['run_date'] for r in results}),
+        "results": len(results),
+        "categories": {name: categories[name] for name in order if name in categories},
+    }
+
+
+def summarize_digest(agent, digest: Dict) -> Optional[str]:
+    """다이제스트 전체에 대한 요약 (Claude 호출 1회)"""
+    compact = {
+        name: {
+            "findings": [f['item_text'] for f in section['findings']],
+            "new_themes": [t['item_text'] for t in section['new_themes']],
+            "persistent_themes": [t['item_text'] for t in section['persistent_themes']],
+        }
+        for name, section in digest['categories'].items()
+    }
+
+    prompt = f"""
+다음은 {digest['since']} ~ {digest['until']} 기간 동안 매일 수집한 광고 시장 인사이트의 카테고리별 집계입니다.
+(findings: 자주 등장한 발견사항, new_themes: 이번 기간에 새로 등장한 테마, persistent_themes: 이전부터 이어지는 테마)
+
+{json.dumps(compact, ensure_ascii=False)}
+
+광고사업개발 리더십을 위한 3-5문장의 종합 요약을 한국어 평문으로 작성해주세요.
+새로 등장한 흐름과 지속되는 흐름을 구분하고, 마지막 문장은 다음 기간에 주목할 점으로 마무리해주세요.
+"""
+
+    try:
+        content = agent._call_claude(prompt, max_tokens=800, label=digest['title'])
+        return content.strip() if content else None
+    except Exception as e:
+        print(f"요약 생성 오류: {e}")
+        return None
+
+
+def render_digest_report(digest: Dict, executive_summary: Optional[str] = None) -> str:
+    """텍스트 다이제스트 리포트 (일간 리포트와 같은 형식)"""
+    report = f"""
+╔══════════════════════════════════════════════════════════╗
+║     🎯 {digest['title']} - {digest['since']} ~ {digest['until']}
+╚══════════════════════════════════════════════════════════╝
+
+지난 {digest['runs']}회의 브리핑({digest['results']}건)을 모아 정리했습니다.
+
+"""
+
+    if executive_summary:
+        report += f"{'='*60}\n"
+        report += "🧭 기간 종합 요약\n"
+        report += f"{'='*60}\n\n"
+        report += f"{executive_summary}\n\n"
+
+    for category, section in digest['categories'].items():
+        report += f"\n{'='*60}\n"
+        report += f"{category}\n"
+        report += f"{'='*60}\n\n"
+        report += f"   수집: {section['results']}건 / {section['days']}일 · 주제 {len(section['queries'])}개\n\n"
+
+        if section['findings']:
+            report += "   자주 언급된 발견사항:\n"
+            for finding in section['findings']:
+                report += f"   • {finding['item_text']} ({finding['days']}일)\n"
+            report += "\n"
+
+        if section['new_themes']:
+            report += "   🆕 새로 등장한 테마: " + ", ".join(t['item_text'] for t in section['new_themes']) + "\n"
+        if section['persistent_themes']:
+            report += "   🔁 지속되는 테마: " + ", ".join(t['item_text'] for t in section['persistent_themes']) + "\n"
+        if section['sources']:
+            report += "   📚 반복 출처: " + ", ".join(s['item_text'] for s in section['sources']) + "\n"
+
+        report += "\n" + "-"*60 + "\n\n"
+
+    report += """
+💬 피드백이나 추가로 모니터링하고 싶은 주제가 있다면 알려주세요!
+
+---
+Powered by Advanced Ad Insights Agent 🤖
+"""
+    return report
+
+
+def digest_results(digest: Dict, executive_summary: Optional[str] = None) -> List[Dict]:
+    """슬랙 / 이메일 전송용 결과 목록 (카테고리 하나 = 항목 하나, 일간 결과와 같은 형태)
+
+    종합 요약이 있으면 맨 앞 항목으로 넣어서 텍스트 리포트와 같이 가장 먼저 보이도록 함
+    """
+    results = []
+    if executive_summary:
+        results.append({
+            "category": digest['title'],
+            "query": "🧭 기간 종합 요약",
+            "summary": executive_summary,
+            "key_findings": [],
+            "impact": "",
+            "actionable_insight": "",
+            "sources": [],
+            "timestamp": digest['until'],
+        })
+
+    for category, section in digest['categories'].items():
+        themes = [t['item_text'] for t in section['new_themes'][:3]]
+        summary = f"{section['results']}건 / {section['days']}일 수집"
+        if themes:
+            summary += f" · 새 테마: {', '.join(themes)}"
+        results.append({
+            "category": digest['title'],
+            "query": category,
+            "summary": summary,
+            "key_findings": [f['item_text'] for f in section['findings']],
+            "impact": "",
+            "actionable_insight": ", ".join(t['item_text'] for t in section['persistent_themes'][:5]),
+            "sources": [s['item_text'] for s in section['sources']],
+            "timestamp": digest['until'],
+        })
+    return results
@@ -0,0 +1,75 @@
+"""
+Run Artifact
+collect / render / deliver 단계 사이에서 주고받는 실행 결과 파일
+"""
+
+import gzip
+import json
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+# 포맷이 바뀌면 올려주세요 (load_artifact가 버전을 검사합니다)
+ARTIFACT_VERSION = 1
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def build_artifact(agent, kind: str, report: Optional[str] = None, timings: Optional[Dict] = None) -> Dict:
+    """에이전트 상태로부터 아티팩트 생성
+
+    kind는 'results' (collect 결과) 또는 'report' (render 결과)
+    """
+    artifact = {
+        "version": ARTIFACT_VERSION,
+        "kind": kind,
+        "agent": type(agent).__name__,
+        "date": agent.today,
+        "created_at": datetime.now().isoformat(timespec='seconds'),
+        "queries": list(agent.search_queries),
+        "results": agent.results,
+        "timings": dict(timings or {}),
+    }
+    if agent.skipped_queries:
+        # 실행 마감으로 건너뛴 주제 (부분 리포트 표시용)
+        artifact["skipped"] = list(agent.skipped_queries)
+    if report is not None:
+        artifact["report"] = report
+    return artifact
+
+
+def save_artifact(artifact: Dict, path: str, compress: Optional[bool] = None) -> int:
+    """아티팩트 저장 (compress 미지정시 확장자가 .gz이면 압축), 저장된 바이트 수 반환"""
+    if compress is None:
+        compress = path.endswith('.gz')
+
+    data = json.dumps(artifact, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if compress:
+        data = gzip.compress(data, mtime=0)
+
+    # 새 러너에서는 --partial-dir / -o 디렉토리가 아직 없음
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def load_artifact(path: str, expected_kinds: Optional[List[str]] = None) -> Dict:
+    """아티팩트 로드 (gzip 여부는 자동 감지)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if data[:2] == GZIP_MAGIC:
+        data = gzip.decompress(data)
+
+    artifact = json.loads(data.decode('utf-8'))
+
+    version = artifact.get('version')
+    if version != ARTIFACT_VERSION:
+        raise ValueError(f"지원하지 않는 아티팩트 버전입니다: {version} (기대값: {ARTIFACT_VERSION})")
+
+    if expected_kinds and artifact.get('kind') not in expected_kinds:
+        raise ValueError(f"{path}: '{artifact.get('kind')}' 아티팩트는 사용할 수 없습니다 (필요: {', '.join(expected_kinds)})")
+
+    return artifact
@@ -0,0 +1,154 @@
+"""
+Sharded Collection
+search_queries를 N개 샤드로 나눠 수집하고, 부분 결과를 원래 쿼리 순서대로 병합
+"""
+
+import glob
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from run_artifact import build_artifact, save_artifact, load_artifact
+
+
+def shard_positions(query_count: int, shard_count: int, shard_index: int) -> List[int]:
+    """샤드가 담당하는 쿼리 위치 (라운드 로빈이라 카테고리가 고르게 섞임)"""
+    if shard_count < 1 or not 0 <= shard_index < shard_count:
+        raise ValueError(f"잘못된 샤드 지정: {shard_index}/{shard_count}")
+    return list(range(shard_index, query_count, shard_count))
+
+
+def queries_fingerprint(queries: List[str]) -> str:
+    """쿼리 목록 지문 - 샤드끼리 같은 목록으로 수집했는지 확인용"""
+    return hashlib.sha256('\n'.join(queries).encode('utf-8')).hexdigest()[:16]
+
+
+def partial_path(output_dir: str, shard_index: int, shard_count: int) -> str:
+    """부분 결과 파일 기본 경로"""
+    return os.path.join(output_dir, f"run-partial-{shard_index}-of-{shard_count}.json.gz")
+
+
+def collect_shard(agent, shard_index: int, shard_count: int, output: str) -> Dict:
+    """샤드 하나를 수집하고 부분 결과 아티팩트 저장"""
+    all_queries = list(agent.search_queries)
+    positions = shard_positions(len(all_queries), shard_count, shard_index)
+
+    print(f"🧩 샤드 {shard_index + 1}/{shard_count}: {len(positions)}개 주제 담당")
+    agent.search_queries = [all_queries[p] for p in positions]
+    started = time.perf_counter()
+    agent.collect_all_insights()
+    elapsed = round(time.perf_counter() - started, 3)
+
+    # 결과마다 자기 쿼리의 위치를 기록 (실패 / 마감으로 건너뛴 쿼리가 섞여도 어긋나지 않도록)
+    unclaimed = {}
+    for p in positions:
+        unclaimed.setdefault(all_queries[p], []).append(p)
+    result_positions = [unclaimed[result['query']].pop(0) for result in agent.results]
+
+    agent.search_queries = all_queries
+    artifact = build_artifact(agent, 'partial', timings={'collect': elapsed})
+    artifact['shard'] = {
+        "index": shard_index,
+        "count": shard_count,
+        "fingerprint": queries_fingerprint(all_queries),
+        "positions": positions,
+        "result_positions": result_positions,
+    }
+
+    size = save_artifact(artifact, output)
+    print(f"💾 샤드 결과 저장: {output} ({size:,} bytes)")
+    return artifact
+
+
+def _run_shard_process(agent_cls, api_key: str, shard_index: int, shard_count: int, output: str) -> int:
+    """로컬 프로세스에서 샤드 실행 (ProcessPoolExecutor용)"""
+    agent = agent_cls(api_key)
+    artifact = collect_shard(agent, shard_index, shard_count, output)
+    return len(artifact['results'])
+
+
+def collect_local_shards(agent_cls, api_key: str, shard_count: int, output_dir: str,
+                         shard_indices: Optional[List[int]] = None) -> List[str]:
+    """여러 로컬 프로세스로 샤드를 동시에 수집, 부분 결과 경로 목록 반환"""
+    shard_indices = list(range(shard_count)) if shard_indices is None else shard_indices
+    paths = [partial_path(output_dir, i, shard_count) for i in shard_indices]
+    os.makedirs(output_dir, exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=len(shard_indices)) as executor:
+        futures = [
+            executor.submit(_run_shard_process, agent_cls, api_key, i, shard_count, path)
+            for i, path in zip(shard_indices, paths)
+        ]
+        for future in futures:
+            future.result()
+
+    return paths
+
+
+def expand_inputs(inputs: List[str]) -> List[str]:
+    """파일/디렉토리/글롭 패턴을 부분 결과 파일 목록으로 확장"""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.extend(sorted(glob.glob(os.path.join(item, 'run-partial-*.json*'))))
+        elif any(ch in item for ch in '*?['):
+            paths.extend(sorted(glob.glob(item)))
+        else:
+            paths.append(item)
+    return paths
+
+
+def merge_partials(partials: List[Dict]) -> Tuple[Optional[Dict], List[int]]:
+    """부분 결과 병합 - (병합된 아티팩트, 누락된 샤드 번호 목록) 반환
+
+    같은 샤드가 여러 번 있으면 나중에 만들어진 것(재실행분)을 사용
+    """
+    if not partials:
+        return None, []
+
+    first = partials[0]
+    shard_count = first['shard']['count']
+    fingerprint = first['shard']['fingerprint']
+
+    by_index = {}
+    for partial in partials:
+        shard = partial['shard']
+        if shard['count'] != shard_count or shard['fingerprint'] != fingerprint:
+            raise ValueError("샤드 구성이 서로 다릅니다 (샤드 수 또는 쿼리 목록 불일치)")
+        previous = by_index.get(shard['index'])
+        if previous is None or partial['created_at'] >= previous['created_at']:
+            by_index[shard['index']] = partial
+
+    missing = [i for i in range(shard_count) if i not in by_index]
+    if missing:
+        return None, missing
+
+    positioned = []
+    timings = {}
+    for index in sorted(by_index):
+        partial = by_index[index]
+        positioned.extend(zip(partial['shard']['result_positions'], partial['results']))
+        timings[f"collect_shard_{index}"] = partial.get('timings', {}).get('collect')
+    positioned.sort(key=lambda item: item[0])
+
+    merged = dict(first)
+    merged.pop('shard')
+    merged['kind'] = 'results'
+    merged['created_at'] = datetime.now().isoformat(timespec='seconds')
+    merged['date'] = min(p['date'] for p in by_index.values())
+    merged['results'] = [result for _, result in positioned]
+    skipped = [q for index in sorted(by_index) for q in by_index[index].get('skipped', [])]
+    if skipped:
+        merged['skipped'] = skipped
+    else:
+        merged.pop('skipped', None)
+    merged['timings'] = timings
+    return merged, []
+
+
+def load_partials(paths: List[str]) -> List[Dict]:
+    """부분 결과 파일 로드"""
+    return [load_artifact(path, ['partial']) for path in paths]
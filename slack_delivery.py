@@ -0,0 +1,172 @@
+"""
+Slack Delivery
+슬랙 블록 생성과 스레드 게시 (봇 토큰이면 chat.postMessage 스레드, 웹훅이면 순서대로 개별 메시지)
+"""
+
+from typing import Dict, List, Optional
+
+import requests
+
+from deadline import Deadline, SLACK_TIMEOUT
+from report_labels import LABELS
+
+
+SLACK_POST_MESSAGE_URL = "https://slack.com/api/chat.postMessage"
+
+# format_insight가 쓰는 결과 필드
+CONSUMED_FIELDS = ('summary', 'key_findings', 'actionable_insight')
+
+# 섹션 블록 텍스트 한도 3000자
+SECTION_TEXT_LIMIT = 3000
+
+
+def escape_mrkdwn(text: str) -> str:
+    """슬랙 mrkdwn 제어 문자 이스케이프"""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def split_text(text: str, limit: int = SECTION_TEXT_LIMIT) -> List[str]:
+    """줄 단위로 limit 이하 조각으로 분할 (한 줄이 너무 길면 강제로 자름)"""
+    chunks, current = [], ''
+    for line in text.split('\n'):
+        while len(line) > limit:
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(line[:limit])
+            line = line[limit:]
+        candidate = f"{current}\n{line}" if current else line
+        if len(candidate) > limit:
+            chunks.append(current)
+            current = line
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def section(text: str) -> Dict:
+    """섹션 블록 (한도를 넘으면 자름 - 잘리면 안 되는 긴 텍스트는 split_text로 먼저 나눌 것)"""
+    if len(text) > SECTION_TEXT_LIMIT:
+        text = text[:SECTION_TEXT_LIMIT - 1] + '…'
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+
+def build_header_blocks(title: str, today: str, query_count: int) -> List[Dict]:
+    """스트리밍 시작 메시지 - 카테고리 섹션은 이 메시지의 스레드로 이어짐"""
+    return [
+        {
+            "type": "header",
+            "text": {"type": "plain_text", "text": f"🎯 {title} - {today}", "emoji": True}
+        },
+        section(f"*{query_count}개* 주제를 수집 중입니다. 카테고리별로 완료되는 대로 스레드에 올립니다 🧵"),
+    ]
+
+
+def format_insight(item: Dict, labels: Optional[Dict[str, str]] = None) -> str:
+    """인사이트 하나를 mrkdwn 텍스트로 변환"""
+    labels = labels or LABELS
+    text = f"*📌 {escape_mrkdwn(item['query'])}*"
+    if item.get('last_checked'):
+        text += f" _({escape_mrkdwn(labels['last_checked'])}: {item['last_checked']})_"
+    text += f"\n{escape_mrkdwn(item.get('summary', ''))}"
+
+    for finding in (item.get('key_findings') or [])[:3]:
+        text += f"\n• {escape_mrkdwn(finding)}"
+
+    if item.get('actionable_insight'):
+        text += f"\n💡 {escape_mrkdwn(item['actionable_insight'])}"
+    return text
+
+
+def build_category_blocks(category: str, items: List[Dict], labels: Optional[Dict[str, str]] = None) -> List[Dict]:
+    """카테고리 섹션 블록"""
+    blocks = [section(f"*{escape_mrkdwn(category)}*"), {"type": "divider"}]
+    for item in items:
+        # 한도를 넘는 인사이트는 자르지 않고 줄 단위로 여러 섹션에 나눠 담음
+        blocks.extend(section(chunk) for chunk in split_text(format_insight(item, labels)))
+    return blocks
+
+
+class SlackThread:
+    """메시지 묶음을 하나의 스레드로 게시
+
+    bot_token과 channel이 있으면 첫 메시지의 ts로 이후 메시지를 스레드 답글로 달고,
+    웹훅은 스레드를 지원하지 않으므로 같은 채널에 순서대로 게시
+    deadline이 있으면 요청 타임아웃이 남은 시간으로 줄어들고, 마감이 지나면 게시하지 않음
+    부모 메시지 게시에 실패하면 이후 메시지는 보내지 않고 실패로 셈 (failures)
+    """
+
+    def __init__(self, webhook_url: Optional[str] = None, bot_token: Optional[str] = None,
+                 channel: Optional[str] = None, deadline: Optional[Deadline] = None):
+        self.webhook_url = webhook_url
+        self.bot_token = bot_token
+        self.channel = channel
+        self.deadline = deadline or Deadline()
+        self.thread_ts = None
+        self.posted = 0
+        self.failures = 0
+
+    @property
+    def label(self) -> str:
+        return f"#{self.channel}" if self.bot_token else "webhook"
+
+    @property
+    def parent_failed(self) -> bool:
+        return self.failures > 0 and self.posted == 0
+
+    def post(self, blocks: List[Dict], text: str) -> bool:
+        """메시지 게시 (첫 메시지가 스레드의 부모)"""
+        if self.parent_failed:
+            self.failures += 1
+            return False
+
+        if self._post(blocks, text):
+            self.posted += 1
+            return True
+        self.failures += 1
+        if self.parent_failed:
+            print(f"   ⚠️  부모 메시지 게시 실패 - {self.label} 스레드에는 더 게시하지 않음")
+        return False
+
+    def _post(self, blocks: List[Dict], text: str) -> bool:
+        try:
+            if self.bot_token:
+                return self._post_api(blocks, text)
+            response = requests.post(self.webhook_url, json={"blocks": blocks, "text": text}, timeout=self.deadline.timeout(SLACK_TIMEOUT))
+            if response.status_code != 200:
+                print(f"   ❌ 슬랙 전송 실패 ({self.label}): {response.status_code}")
+                return False
+            return True
+        except Exception as e:
+            print(f"   ❌ 슬랙 전송 오류 ({self.label}): {e}")
+            return False
+
+    def _post_api(self, blocks: List[Dict], text: str) -> bool:
+        payload = {"channel": self.channel, "blocks": blocks, "text": text}
+        if self.thread_ts:
+            payload["thread_ts"] = self.thread_ts
+
+        response = requests.post(
+            SLACK_POST_MESSAGE_URL,
+            headers={"Authorization": f"Bearer {self.bot_token}"},
+            json=payload,
+            timeout=self.deadline.timeout(SLACK_TIMEOUT)
+        )
+        data = response.json() if response.status_code == 200 else {}
+        if not data.get('ok'):
+            print(f"   ❌ 슬랙 전송 실패 ({self.label}): {data.get('error', response.status_code)}")
+            return False
+
+        if not self.thread_ts:
+            self.thread_ts = data['ts']
+        return True
+
+
+def build_threads(webhook_urls: List[str], bot_token: Optional[str] = None,
+                  channels: Optional[List[str]] = None, deadline: Optional[Deadline] = None) -> List[SlackThread]:
+    """전송 대상 목록 (봇 토큰 채널 + 웹훅)"""
+    threads = [SlackThread(bot_token=bot_token, channel=c, deadline=deadline) for c in (channels or []) if bot_token]
+    threads.extend(SlackThread(webhook_url=url, deadline=deadline) for url in webhook_urls if url and url.strip())
+    return threads
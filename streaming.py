@@ -0,0 +1,67 @@
+"""
+Streaming Delivery
+수집 결과가 나오는 대로 카테고리 단위로 슬랙 스레드에 게시 (전체 수집을 기다리지 않음)
+"""
+
+import time
+from typing import Dict, List
+
+from report_packing import pack_slack_blocks
+from slack_delivery import SlackThread, build_header_blocks, build_category_blocks, section
+
+
+def stream_to_slack(agent, threads: List[SlackThread]) -> Dict[str, float]:
+    """수집하면서 카테고리가 끝날 때마다 게시, 카테고리별 게시 시점(초) 반환
+
+    카테고리에 속하지 않는 쿼리는 일간 리포트와 마찬가지로 슬랙 섹션에서 제외
+    게시 실패는 스레드별로 기록되고(thread.failures), 헤더 게시에 실패한 스레드에는 더 게시하지 않음
+    """
+    started = time.perf_counter()
+
+    # 카테고리별로 남은 쿼리 위치
+    remaining = {name: set() for name in agent.categories}
+    category_of = {}
+    for i, query in enumerate(agent.search_queries):
+        category = agent._categorize(query)
+        if category:
+            remaining[category].add(i)
+            category_of[i] = category
+
+    header = build_header_blocks(agent.report_title, agent.today, len(agent.search_queries))
+    posted = sum(thread.post(header, f"{agent.report_title} - {agent.today}") for thread in threads)
+    print(f"🧵 헤더 게시 완료 ({posted}/{len(threads)}개 채널)\n")
+
+    collected = {}
+    published = {}
+    for index, result in agent.iter_insights():
+        if result:
+            collected[index] = result
+
+        category = category_of.get(index)
+        if category is None:
+            continue
+
+        remaining[category].discard(index)
+        if remaining[category]:
+            continue
+
+        items = [collected[i] for i in sorted(category_of) if category_of[i] == category and i in collected]
+        if items:
+            # 인사이트가 많은 카테고리는 슬랙 한도(50블록)를 넘으므로 여러 메시지로 나눠서 스레드에 게시
+            for blocks in pack_slack_blocks(build_category_blocks(category, items)):
+                for thread in threads:
+                    thread.post(blocks, category)
+        published[category] = round(time.perf_counter() - started, 3)
+        print(f"🧵 {category} 게시 ({published[category]}초)\n")
+
+    agent.results.extend(collected[i] for i in sorted(collected))
+
+    footer_text = f"✅ 총 *{len(agent.results)}개* 인사이트 게시 완료. 전체 리포트는 이메일을 확인해주세요!"
+    if agent.skipped_queries:
+        footer_text += f"\n⚠️ {agent.partial_notice()}: {', '.join(agent.skipped_queries)}"
+    footer = [section(footer_text)]
+    for thread in threads:
+        thread.post(footer, "완료")
+
+    print(f"✨ 수집 완료! 총 {len(agent.results)}개 인사이트 확보\n")
+    return published
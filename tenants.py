@@ -0,0 +1,144 @@
+"""
+Multi-Tenant Runs
+여러 팀(테넌트)의 쿼리를 합쳐 중복 없이 한 번만 수집하고, 결과를 팀별 리포트 / 수신자로 나눠 전송
+
+설정 파일 (JSON):
+{
+  "tenants": [
+    {
+      "name": "광고사업개발",
+      "report_title": "광고 시장 Daily Brief",       (선택)
+      "search_queries": ["retail media 성장", ...],  (선택, 없으면 에이전트 기본값)
+      "categories": {"🔥 트렌드": ["트렌드", "retail"], ...},  (선택)
+      "slack_webhooks": ["https://hooks.slack.com/..."],
+      "slack_channels": ["C0123456"],                (선택, SLACK_BOT_TOKEN 필요)
+      "email_recipients": ["team@example.com"]
+    }
+  ]
+}
+SMTP 계정(FROM_EMAIL / EMAIL_PASSWORD)과 봇 토큰은 설정 파일이 아니라 환경변수에서 읽음
+"""
+
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+DEFAULT_TENANTS_PATH = "tenants.json"
+
+
+def query_key(query: str) -> str:
+    """중복 판단용 키 (공백 / 대소문자 차이 무시)"""
+    return ' '.join(query.split()).casefold()
+
+
+def load_tenants(path: str) -> List[Dict]:
+    """설정 파일에서 테넌트 목록 로드"""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+
+    tenants = config.get('tenants', [])
+    if not tenants:
+        raise ValueError(f"테넌트 설정이 비어 있습니다: {path}")
+
+    names = [t.get('name') for t in tenants]
+    if not all(names) or len(set(names)) != len(names):
+        raise ValueError("테넌트마다 서로 다른 name이 필요합니다")
+    return tenants
+
+
+def union_queries(query_lists: List[List[str]]) -> Tuple[List[str], int]:
+    """처음 등장한 순서대로 쿼리 합집합, (합집합, 제거된 중복 수) 반환"""
+    seen = set()
+    union = []
+    total = 0
+    for queries in query_lists:
+        for query in queries:
+            total += 1
+            key = query_key(query)
+            if key not in seen:
+                seen.add(key)
+                union.append(query)
+    return union, total - len(union)
+
+
+def merge_categories(category_maps: List[Dict[str, List[str]]]) -> Dict[str, List[str]]:
+    """카테고리 정의 합치기 (저장소 기록용, 같은 이름이면 키워드 합집합)"""
+    merged = {}
+    for categories in category_maps:
+        for name, keywords in categories.items():
+            merged.setdefault(name, [])
+            merged[name].extend(k for k in keywords if k not in merged[name])
+    return merged
+
+
+def configure_tenant(agent, tenant: Dict):
+    """에이전트 인스턴스를 테넌트 설정으로 맞춤 (쿼리 / 카테고리 / 제목 / 봇 채널)"""
+    if tenant.get('search_queries'):
+        agent.search_queries = union_queries([tenant['search_queries']])[0]
+    if tenant.get('categories'):
+        agent.categories = dict(tenant['categories'])
+    if tenant.get('report_title'):
+        agent.report_title = tenant['report_title']
+    # 환경변수 SLACK_CHANNEL은 모든 테넌트가 공유하지 않도록 테넌트 설정만 사용
+    agent.slack_channels = list(tenant.get('slack_channels', []))
+
+
+def collect_shared(agent_cls, api_key: str, tenants: List[Dict], db_path: Optional[str] = None):
+    """모든 테넌트 쿼리의 합집합을 한 번만 수집한 에이전트 반환"""
+    agent = agent_cls(api_key)
+    if db_path:
+        agent.insight_db_path = db_path
+
+    query_lists = [t.get('search_queries') or agent.search_queries for t in tenants]
+    agent.search_queries, duplicates = union_queries(query_lists)
+    agent.categories = merge_categories([t.get('categories') or agent.categories for t in tenants])
+
+    print(f"👥 {len(tenants)}개 팀 · 쿼리 {len(agent.search_queries)}개 (중복 {duplicates}개 제외)\n")
+    agent.collect_all_insights()
+    agent.save_to_store()
+    return agent
+
+
+def tenant_results(shared, agent) -> Tuple[List[Dict], List[str], List[str]]:
+    """공유 수집 결과에서 테넌트 쿼리에 해당하는 결과 / 실패 / 건너뛴 쿼리 추출 (테넌트 표기 유지)"""
+    by_key = {query_key(r['query']): r for r in shared.results}
+    failed = {query_key(q) for q in shared.failed_queries}
+    skipped = {query_key(q) for q in shared.skipped_queries}
+
+    results = []
+    failed_queries = []
+    skipped_queries = []
+    for query in agent.search_queries:
+        key = query_key(query)
+        if key in by_key:
+            results.append(dict(by_key[key], query=query))
+        elif key in failed:
+            failed_queries.append(query)
+        elif key in skipped:
+            skipped_queries.append(query)
+    return results, failed_queries, skipped_queries
+
+
+def run_tenants(agent_cls, api_key: str, tenants: List[Dict], load_delivery: Callable[..., Tuple],
+                db_path: Optional[str] = None, dry_run: bool = False) -> Dict[str, bool]:
+    """합집합 수집 → 테넌트별 리포트 생성 / 전송, 테넌트별 전송 성공 여부 반환"""
+    shared = collect_shared(agent_cls, api_key, tenants, db_path)
+
+    delivered = {}
+    for tenant in tenants:
+        agent = agent_cls(api_key)
+        configure_tenant(agent, tenant)
+        agent.today = shared.today
+        agent.results, agent.failed_queries, agent.skipped_queries = tenant_results(shared, agent)
+
+        print(f"\n👤 {tenant['name']}: 인사이트 {len(agent.results)}개")
+        report = agent.generate_comprehensive_report()
+
+        if dry_run:
+            print(report)
+            delivered[tenant['name']] = True
+            continue
+
+        delivered[tenant['name']] = agent.deliver(report, *load_delivery(tenant))
+
+    return delivered
@@ -0,0 +1,185 @@
+"""
+근거 자료 출처 테스트 스크립트
+로컬 http.server로 RSS 피드 / 공지 페이지를 띄워서 조건부 요청과 새 항목 기록을 확인 (네트워크 / API 키 불필요)
+"""
+import os
+import sys
+import tempfile
+import threading
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grounding
+from grounding import Grounding
+
+
+FEED_QUERY = "구글 애즈 변경사항"
+PAGE_QUERY = "개인정보보호 광고 규제"
+
+
+class FixtureSite:
+    """피드 / 공지 페이지 픽스처 (내용을 바꾸면 ETag / Last-Modified도 바뀜)"""
+
+    def __init__(self):
+        self.feed_items = ["검색 광고 입찰 전략 변경 안내", "실적 최대화 캠페인 보고서 개편"]
+        self.notice = "맞춤형 광고 행태정보 처리 가이드라인 개정안을 행정예고합니다. 의견 제출 기한은 다음 달 말일까지입니다."
+        self.version = 1
+        self.requests = []
+
+    def change_feed(self, title: str):
+        self.feed_items.append(title)
+        self.version += 1
+
+    def feed(self) -> bytes:
+        items = ''.join(
+            f"<item><title>{title}</title><description>{title} 상세 내용</description>"
+            f"<link>http://fixture/{n}</link></item>"
+            for n, title in enumerate(self.feed_items)
+        )
+        return f'<?xml version="1.0" encoding="utf-8"?><rss><channel>{items}</channel></rss>'.encode('utf-8')
+
+    def page(self) -> bytes:
+        return f"<html><body><nav>메뉴</nav><p>{self.notice}</p></body></html>".encode('utf-8')
+
+
+def start_server(site: FixtureSite):
+    last_modified = formatdate(0, usegmt=True)
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            etag = f'"v{site.version}"'
+            conditional = bool(self.headers.get('If-None-Match') or self.headers.get('If-Modified-Since'))
+            site.requests.append((self.path, conditional))
+
+            if self.path == '/feed.xml':
+                if self.headers.get('If-None-Match') == etag:
+                    return self._reply(304)
+                return self._reply(200, site.feed(), 'application/rss+xml', {'ETag': etag})
+            if self.path == '/notice.html':
+                if self.headers.get('If-Modified-Since') == last_modified:
+                    return self._reply(304)
+                return self._reply(200, site.page(), 'text/html; charset=utf-8', {'Last-Modified': last_modified})
+            return self._reply(404)
+
+        def _reply(self, status, body=b'', content_type='text/plain', headers=None):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run_collection(grounding: Grounding, succeeded):
+    """수집 한 번 흉내 (출처 새로고침 → 성공한 쿼리 기록 → 캐시 저장), 쿼리별 근거 자료 반환"""
+    grounding.refresh()
+    contexts = {q: grounding.context_for(q) for q in (FEED_QUERY, PAGE_QUERY)}
+    for query in succeeded:
+        grounding.record_success(query)
+    grounding.save([FEED_QUERY, PAGE_QUERY])
+    return contexts
+
+
+def check(name: str, ok: bool) -> str:
+    """확인 결과 출력, 실패하면 이름 반환"""
+    print(f"{'✅' if ok else '❌'} {name}")
+    return '' if ok else name
+
+
+def test_grounding():
+    """조건부 요청 / 새 항목만 첨부 / 실패한 쿼리와 길이 제한으로 빠진 항목 재전달 확인"""
+    site = FixtureSite()
+    server = start_server(site)
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    sources = [
+        {"name": "광고 플랫폼 공지", "url": f"{base}/feed.xml", "keywords": ["구글"]},
+        {"name": "규제기관 공지", "url": f"{base}/notice.html", "keywords": ["개인정보"]},
+    ]
+
+    results = []
+    try:
+        _run_checks(site, sources, results)
+    finally:
+        server.shutdown()
+
+    failed = [name for name in results if name]
+    assert not failed, f"실패한 확인: {', '.join(failed)}"
+
+
+def _run_checks(site: FixtureSite, sources, results):
+    """수집을 단계별로 돌리면서 확인 결과를 results에 추가"""
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = os.path.join(tmp, 'grounding_cache.json')
+
+        # 1) 첫 실행: 두 출처 모두 새 항목, 페이지 쿼리는 실패
+        contexts = run_collection(Grounding(sources, cache_path), succeeded=[FEED_QUERY])
+        results.append(check("첫 실행에서 피드 항목 첨부", "검색 광고 입찰 전략 변경 안내" in contexts[FEED_QUERY]))
+        results.append(check("첫 실행에서 공지 문단 첨부", "행정예고" in contexts[PAGE_QUERY]))
+        results.append(check("메뉴 등 짧은 텍스트 제외", "메뉴" not in contexts[PAGE_QUERY]))
+
+        # 2) 두 번째 실행: 성공한 피드는 304, 실패한 쿼리의 공지는 다시 받아서 다시 첨부
+        site.requests.clear()
+        contexts = run_collection(Grounding(sources, cache_path), succeeded=[FEED_QUERY, PAGE_QUERY])
+        results.append(check("성공한 출처는 조건부 요청 → 304", ("/feed.xml", True) in site.requests and not contexts[FEED_QUERY]))
+        results.append(check("실패한 쿼리의 항목은 다음 실행에서 다시 첨부", "행정예고" in contexts[PAGE_QUERY]))
+
+        # 3) 세 번째 실행: 둘 다 바뀌지 않음
+        site.requests.clear()
+        contexts = run_collection(Grounding(sources, cache_path), succeeded=[FEED_QUERY, PAGE_QUERY])
+        results.append(check("바뀌지 않은 출처는 모두 조건부 요청",
+                             sorted(site.requests) == [("/feed.xml", True), ("/notice.html", True)]))
+        results.append(check("바뀌지 않은 출처는 첨부하지 않음", not any(contexts.values())))
+
+        # 4) 피드에 항목 추가: 새 항목만 첨부
+        site.change_feed("쇼핑 광고 정책 업데이트")
+        contexts = run_collection(Grounding(sources, cache_path), succeeded=[FEED_QUERY, PAGE_QUERY])
+        results.append(check("새로 추가된 피드 항목만 첨부",
+                             "쇼핑 광고 정책 업데이트" in contexts[FEED_QUERY]
+                             and "검색 광고 입찰 전략 변경 안내" not in contexts[FEED_QUERY]))
+
+        # 5) 길이 제한으로 일부만 첨부: 빠진 항목은 본 것으로 기록하지 않고 다음 실행에서 첨부
+        long_titles = [f"{name} 입찰 로직 개편 " + "세부 변경 사항 " * 20 for name in ("검색", "디스플레이", "동영상")]
+        for title in long_titles:
+            site.change_feed(title)
+        limit = grounding.MAX_CONTEXT_CHARS
+        grounding.MAX_CONTEXT_CHARS = 700
+        try:
+            contexts = run_collection(Grounding(sources, cache_path), succeeded=[FEED_QUERY, PAGE_QUERY])
+        finally:
+            grounding.MAX_CONTEXT_CHARS = limit
+        sent = [title for title in long_titles if title in contexts[FEED_QUERY]]
+        results.append(check("길이 제한 안의 항목만 첨부", sent == long_titles[:1]))
+
+        site.requests.clear()
+        contexts = run_collection(Grounding(sources, cache_path), succeeded=[FEED_QUERY, PAGE_QUERY])
+        results.append(check("첨부하지 못한 항목은 다음 실행에서 첨부 (조건부 헤더 갱신 안 함)",
+                             all(title in contexts[FEED_QUERY] for title in long_titles[1:])
+                             and long_titles[0] not in contexts[FEED_QUERY]))
+
+
+def main():
+    print("\n" + "="*60)
+    print("🧪 광고 인사이트 에이전트 - 근거 자료 출처 테스트")
+    print("="*60 + "\n")
+
+    try:
+        test_grounding()
+        ok = True
+    except AssertionError:
+        ok = False
+    print()
+    print(f"근거 자료: {'✅ 성공' if ok else '❌ 실패'}")
+    print()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+쿼리 스케줄러 novelty 보정 테스트 스크립트
+손으로 만든 보정 세트(같은 내용의 패러프레이즈 / 실제로 바뀐 결과 / 이전 내용 + 새 전개)로 PARAPHRASE_NOISE, RESET_THRESHOLD 확인 (네트워크 / API 키 불필요)
+"""
+import os
+import sys
+import tempfile
+
+from query_scheduler import PARAPHRASE_NOISE, RESET_THRESHOLD, QueryScheduler, novelty
+
+
+def R(summary, findings):
+    return {"summary": summary, "key_findings": list(findings), "sources": []}
+
+
+QUERIES = [
+    "온라인 플랫폼 법안 국회 통과",
+    "구글 서드파티 쿠키 정책",
+    "리테일 미디어 쿠팡 네이버",
+    "메타 Advantage+ 광고 자동화",
+    "개인정보보호위원회 맞춤형 광고 가이드라인",
+    "틱톡 쇼핑 광고 한국",
+]
+
+# (이전 결과, 같은 상태를 다르게 표현한 결과)
+PARAPHRASES = [
+    (R("온라인 플랫폼 법안은 여전히 국회 정무위원회에 계류 중입니다. 업계는 사전 규제 조항에 반대하고 있습니다.",
+       ["플랫폼 법안 국회 계류 지속", "업계, 사전 지정 조항에 반발", "공정위는 연내 처리 목표"]),
+     R("국회 정무위에 계류된 온라인 플랫폼 법안에 뚜렷한 진전이 없습니다. 사전 규제 방식을 두고 업계 반대가 이어지고 있습니다.",
+       ["법안 처리 일정 미정", "사전 지정 제도에 대한 업계 반발 지속", "공정위 연내 통과 추진"])),
+    (R("쿠키리스 환경에 대비해 광고주들은 퍼스트파티 데이터 확보에 집중하고 있습니다. 구글의 서드파티 쿠키 정책은 변동 가능성이 있습니다.",
+       ["퍼스트파티 데이터 중요성 부각", "구글 쿠키 정책 불확실", "컨텍스추얼 타기팅 재조명"]),
+     R("광고주들이 쿠키 없는 환경을 준비하며 자사 데이터 수집을 강화하고 있습니다. 구글 서드파티 쿠키 지원 종료 일정은 아직 불확실합니다.",
+       ["자사(퍼스트파티) 데이터 확보 경쟁", "구글 서드파티 쿠키 일정 불투명", "문맥 기반 타기팅 관심 증가"])),
+    (R("리테일 미디어 시장은 쿠팡과 네이버를 중심으로 빠르게 성장하고 있습니다. 유통사들이 광고 플랫폼을 잇달아 강화하는 추세입니다.",
+       ["쿠팡 광고 매출 성장세", "네이버 쇼핑 광고 확대", "유통사 리테일 미디어 진출"]),
+     R("쿠팡, 네이버가 주도하는 리테일 미디어가 고성장을 이어가고 있습니다. 여러 유통사가 자체 광고 상품을 강화하고 있습니다.",
+       ["쿠팡 광고 사업 고성장", "네이버 쇼핑 검색광고 강화", "유통사들의 리테일 미디어 네트워크 구축"])),
+    (R("메타는 Advantage+ 캠페인 자동화를 확대하고 있습니다. 광고주 성과 개선 사례가 늘고 있습니다.",
+       ["Advantage+ 쇼핑 캠페인 확대", "자동화 기반 성과 개선", "크리에이티브 자동 생성 기능"]),
+     R("메타가 Advantage+ 중심의 광고 자동화를 계속 넓히고 있습니다. 자동화 캠페인으로 성과가 개선됐다는 광고주 사례가 많아지고 있습니다.",
+       ["Advantage+ 캠페인 적용 범위 확대", "자동화로 ROAS 개선 사례 증가", "생성형 크리에이티브 도구 제공"])),
+    (R("개인정보보호위원회는 맞춤형 광고 가이드라인을 준비 중입니다. 행태정보 수집 동의 절차 강화가 예상됩니다.",
+       ["맞춤형 광고 가이드라인 마련 중", "행태정보 동의 강화 전망", "플랫폼 사업자 의견 수렴"]),
+     R("개인정보위가 맞춤형 광고 관련 가이드라인을 마련하고 있습니다. 행태정보 수집에 대한 동의 요건이 강화될 전망입니다.",
+       ["맞춤형 광고 지침 준비", "행태정보 수집 동의 요건 강화 예상", "업계 의견 청취 진행"])),
+    (R("틱톡은 한국에서 쇼핑 광고 상품을 테스트하고 있습니다. 숏폼 광고 수요가 늘고 있습니다.",
+       ["틱톡 쇼핑 광고 테스트", "숏폼 광고 수요 증가", "국내 광고주 유치 노력"]),
+     R("틱톡이 국내에서 커머스 광고 상품을 시범 운영하고 있습니다. 짧은 영상 광고에 대한 수요가 커지고 있습니다.",
+       ["틱톡 커머스 광고 시범 운영", "숏폼 영상 광고 수요 확대", "한국 광고주 영입 추진"])),
+]
+
+# 이전 결과 대신 나온 실제로 바뀐 상황
+DEVELOPMENTS = [
+    R("온라인 플랫폼 법안이 국회 본회의를 통과했습니다. 시행령 마련과 함께 내년 하반기 시행됩니다.",
+      ["플랫폼법 본회의 통과", "시행 시기 내년 하반기", "시행령 입법예고 예정"]),
+    R("구글이 크롬의 서드파티 쿠키를 유지하기로 최종 발표했습니다. 대신 사용자 선택 프롬프트를 도입합니다.",
+      ["구글, 쿠키 폐지 철회 확정", "크롬 사용자 선택 프롬프트 도입", "프라이버시 샌드박스 축소"]),
+    R("이마트가 리테일 미디어 사업을 분사하고 외부 광고주 대상 셀프서브 플랫폼을 출시했습니다. 컬리도 광고 상품을 개편했습니다.",
+      ["이마트 리테일 미디어 분사", "셀프서브 광고 플랫폼 출시", "컬리 광고 상품 개편"]),
+    R("메타가 스레드에 광고를 전면 도입했습니다. 국내 광고주도 스레드 광고를 집행할 수 있게 됐습니다.",
+      ["스레드 광고 전면 도입", "국내 광고주 집행 가능", "인스타그램 연동 캠페인 지원"]),
+    R("개인정보위가 맞춤형 광고 가이드라인을 확정 발표했습니다. 비회원 행태정보 수집은 원칙적으로 금지됩니다.",
+      ["맞춤형 광고 가이드라인 확정", "비회원 행태정보 수집 금지", "6개월 유예 기간"]),
+    R("틱톡샵이 한국에 공식 출시됐습니다. 라이브 커머스 광고와 제휴 마케팅 프로그램이 함께 열렸습니다.",
+      ["틱톡샵 국내 공식 출시", "라이브 커머스 광고 지원", "크리에이터 제휴 프로그램 오픈"]),
+]
+
+
+def changed_pairs():
+    """(이전, 실제로 바뀐 결과)"""
+    return [(before, after) for (before, _), after in zip(PARAPHRASES, DEVELOPMENTS)]
+
+
+def superset_pairs():
+    """(이전, 이전 내용을 그대로 두고 새 전개를 덧붙인 결과) - 예: 법안 계류 → 본회의 통과 + 과징금 기준"""
+    return [
+        (before, R(f"{before['summary']} {after['summary']}", before['key_findings'][:2] + after['key_findings'][:2]))
+        for (before, _), after in zip(PARAPHRASES, DEVELOPMENTS)
+    ]
+
+
+def reworded_superset_pairs():
+    """(이전, 표현을 바꾼 이전 내용 + 새 전개)"""
+    return [
+        (before, R(f"{reworded['summary']} {after['summary']}", reworded['key_findings'] + after['key_findings'][:2]))
+        for (before, reworded), after in zip(PARAPHRASES, DEVELOPMENTS)
+    ]
+
+
+def distances(pairs):
+    return [novelty(dict(before, query=query), dict(after, query=query)) for query, (before, after) in zip(QUERIES, pairs)]
+
+
+def interval_after(query, previous, current):
+    """갱신 주기 3일 / novelty 0.33 상태에서 current가 나왔을 때 다음 갱신 주기"""
+    with tempfile.TemporaryDirectory() as tmp:
+        scheduler = QueryScheduler(os.path.join(tmp, 'schedule.json'))
+        scheduler.state[query] = {
+            "last_checked": "2024-01-01", "interval": 3, "novelty": 0.33, "checks": 5,
+            "last_result": dict(previous, query=query),
+        }
+        scheduler.record(query, dict(current, query=query), "2024-01-04")
+        return scheduler.interval(query)
+
+
+def test_paraphrases_do_not_reset():
+    """같은 내용을 다르게 표현한 결과는 매일 확인으로 되돌리지 않음"""
+    for query, distance in zip(QUERIES, distances(PARAPHRASES)):
+        assert distance < RESET_THRESHOLD, (query, distance)
+
+
+def test_changes_reset():
+    """실제로 바뀐 결과는 바로 매일 확인으로 복귀"""
+    for query, distance in zip(QUERIES, distances(changed_pairs())):
+        assert distance >= RESET_THRESHOLD, (query, distance)
+
+
+def test_superset_counts_as_change():
+    """이전 내용을 유지한 채 새 전개가 붙은 결과도 변화로 보고, 그대로인 결과보다 갱신 주기를 짧게 잡음"""
+    for query, distance in zip(QUERIES, distances(superset_pairs())):
+        assert distance > PARAPHRASE_NOISE, (query, distance)
+
+    for query, (before, after) in zip(QUERIES, superset_pairs() + reworded_superset_pairs()):
+        assert interval_after(query, before, after) < interval_after(query, before, before), query
+
+
+def test_reworded_superset_above_paraphrase():
+    """표현이 바뀌면서 새 전개가 붙은 결과는 같은 주제의 패러프레이즈보다 거리가 큼"""
+    for query, paraphrase, reworded in zip(QUERIES, distances(PARAPHRASES), distances(reworded_superset_pairs())):
+        assert reworded > paraphrase, (query, paraphrase, reworded)
+
+
+def main():
+    print("\n" + "="*60)
+    print("🧪 광고 인사이트 에이전트 - 쿼리 스케줄러 novelty 보정 테스트")
+    print("="*60 + "\n")
+
+    print(f"PARAPHRASE_NOISE={PARAPHRASE_NOISE}, RESET_THRESHOLD={RESET_THRESHOLD}\n")
+    for name, pairs in (("패러프레이즈", PARAPHRASES), ("실제 변화", changed_pairs()),
+                        ("이전 내용 + 새 전개", superset_pairs()), ("표현 변경 + 새 전개", reworded_superset_pairs())):
+        print(f"  {name}: {', '.join(f'{d:.2f}' for d in distances(pairs))}")
+    print()
+
+    ok = True
+    for test in (test_paraphrases_do_not_reset, test_changes_reset,
+                 test_superset_counts_as_change, test_reworded_superset_above_paraphrase):
+        try:
+            test()
+            print(f"✅ {test.__doc__}")
+        except AssertionError as e:
+            print(f"❌ {test.__doc__} {e}")
+            ok = False
+
+    print()
+    print(f"novelty 보정: {'✅ 성공' if ok else '❌ 실패'}")
+    print()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
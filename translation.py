@@ -0,0 +1,201 @@
+"""
+Report Translation
+한국어로 한 번 수집한 결과를 수신자 로케일별로 번역 (다시 검색하지 않음)
+
+- 번역할 문자열(결과 / 카테고리 / 제목 / 고정 문구)을 모아 중복을 빼고 묶음 단위로 한 번에 번역 요청
+- 번역 결과는 (로케일, 원문) 해시로 캐시 → 반복되거나 바뀌지 않은 문구는 다시 번역하지 않음
+
+수신자 로케일은 값 뒤에 '|로케일'로 지정 (없으면 기본 한국어):
+  TO_EMAIL=team@example.com,partner@example.com|en
+  SLACK_WEBHOOK_URL=https://hooks.slack.com/...|ja
+"""
+
+import copy
+import hashlib
+import json
+import os
+import re
+from datetime import date, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from html_renderer import HtmlReportRenderer
+from json_state import save_json
+
+
+DEFAULT_LOCALE = 'ko'
+
+LANGUAGES = {
+    'en': 'English',
+    'ja': '日本語 (Japanese)',
+    'zh': '简体中文 (Simplified Chinese)',
+}
+
+# 번역 요청 하나에 넣는 원문 글자 수 / 응답 토큰 상한
+BATCH_CHARS = 3000
+TRANSLATION_MAX_TOKENS = 4000
+
+# 이 기간 동안 쓰이지 않은 번역은 캐시에서 제거
+CACHE_KEEP_DAYS = 30
+
+PLACEHOLDER = re.compile(r'\{\w+\}')
+
+
+def split_locale(value: str) -> Tuple[str, str]:
+    """'수신처|en' → ('수신처', 'en'), 접미사가 없으면 기본 로케일"""
+    target, _, locale = value.partition('|')
+    return target.strip(), locale.strip().lower() or DEFAULT_LOCALE
+
+
+def group_by_locale(values: Iterable[str]) -> Dict[str, List[str]]:
+    """수신처 목록을 로케일별로 나누기 (접미사 제거, 빈 값 제외)"""
+    grouped = {}
+    for value in values:
+        if value and value.strip():
+            target, locale = split_locale(value)
+            grouped.setdefault(locale, []).append(target)
+    return grouped
+
+
+def _key(locale: str, text: str) -> str:
+    return f"{locale}:{hashlib.sha256(text.encode('utf-8')).hexdigest()[:16]}"
+
+
+class TranslationCache:
+    """번역 캐시 (JSON 파일, 키는 로케일 + 원문 해시)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+        self.today = date.today().isoformat()
+
+    def get(self, locale: str, text: str) -> Optional[str]:
+        entry = self.entries.get(_key(locale, text))
+        if entry is None:
+            return None
+        entry['used'] = self.today
+        return entry['text']
+
+    def put(self, locale: str, text: str, translated: str):
+        self.entries[_key(locale, text)] = {"text": translated, "used": self.today}
+
+    def save(self):
+        cutoff = (date.today() - timedelta(days=CACHE_KEEP_DAYS)).isoformat()
+        self.entries = {k: v for k, v in self.entries.items() if v['used'] >= cutoff}
+        save_json(self.path, self.entries)
+
+
+class Translator:
+    """문자열 묶음 번역 (캐시에 없는 것만 배치로 요청)
+
+    call은 프롬프트와 라벨을 받아 응답 텍스트(코드 블록 제거)를 돌려주는 함수 (실패시 None)
+    """
+
+    def __init__(self, cache_path: str, call: Callable[[str, str], Optional[str]]):
+        self.cache = TranslationCache(cache_path)
+        self.call = call
+
+    def translate(self, texts: Iterable[str], locale: str) -> Dict[str, str]:
+        """원문 → 번역 매핑 (번역하지 못한 문구는 원문 그대로)"""
+        unique = list(dict.fromkeys(t for t in texts if t and t.strip()))
+        translated = {}
+        missing = []
+        for text in unique:
+            cached = self.cache.get(locale, text)
+            if cached is None:
+                missing.append(text)
+            else:
+                translated[text] = cached
+
+        for batch in self._batches(missing):
+            for text, result in zip(batch, self._translate_batch(batch, locale) or batch):
+                translated[text] = result
+
+        print(f"🌐 {locale} 번역: 문구 {len(unique)}개 중 캐시 {len(unique) - len(missing)}개 / 새로 번역 {len(missing)}개")
+        return translated
+
+    @staticmethod
+    def _batches(texts: List[str]) -> List[List[str]]:
+        batches = []
+        size = 0
+        for text in texts:
+            if not batches or size + len(text) > BATCH_CHARS:
+                batches.append([])
+                size = 0
+            batches[-1].append(text)
+            size += len(text)
+        return batches
+
+    def _translate_batch(self, batch: List[str], locale: str) -> Optional[List[str]]:
+        """한 번의 호출로 묶음 번역 (응답이 올바르면 캐시에 저장)"""
+        language = LANGUAGES.get(locale, locale)
+        prompt = f"""
+다음 JSON 배열의 한국어 문자열을 각각 {language}(으)로 번역해주세요.
+- 배열 길이와 순서를 그대로 유지
+- 이모지, URL, 브랜드 / 서비스 이름, {{count}} 같은 중괄호 자리표시자, *굵게* 같은 서식 기호는 그대로 유지
+- 광고 업계 용어는 해당 언어권 실무자가 쓰는 표현으로
+
+번역된 JSON 배열로만 응답해주세요 (다른 설명 없이):
+{json.dumps(batch, ensure_ascii=False)}
+"""
+        try:
+            content = self.call(prompt, f"번역 {locale}")
+            if content is None:
+                return None
+            result = json.loads(content)
+        except Exception as e:
+            print(f"   ⚠️  번역 실패 ({locale}, {len(batch)}개 문구 원문 유지): {e}")
+            return None
+
+        if not isinstance(result, list) or len(result) != len(batch) or not all(isinstance(r, str) for r in result):
+            print(f"   ⚠️  번역 응답 형식 오류 ({locale}, {len(batch)}개 문구 원문 유지)")
+            return None
+
+        translated = []
+        for text, candidate in zip(batch, result):
+            # 자리표시자가 깨진 번역은 쓰지 않음 (원문 유지, 캐시하지 않음)
+            if sorted(PLACEHOLDER.findall(text)) != sorted(PLACEHOLDER.findall(candidate)):
+                translated.append(text)
+                continue
+            self.cache.put(locale, text, candidate)
+            translated.append(candidate)
+        return translated
+
+    def save(self):
+        self.cache.save()
+
+
+def localize(agent, locale: str, translator: Translator):
+    """수집 결과 / 카테고리 / 제목 / 고정 문구를 locale로 번역한 에이전트 사본 (렌더링 / 전송용)"""
+    categories = {r['query']: r.get('category') or agent._categorize(r['query']) for r in agent.results}
+
+    texts = [agent.report_title, *agent.labels.values(), *agent.categories, *categories.values(), *agent.skipped_queries]
+    for result in agent.results:
+        texts.extend([result['query'], result.get('summary'), result.get('actionable_insight')])
+        texts.extend((result.get('key_findings') or [])[:3])
+    translated = translator.translate([text for text in texts if text], locale)
+
+    def t(text):
+        return translated.get(text, text) if text else text
+
+    view = copy.copy(agent)
+    view.locale = locale
+    view.report_title = t(agent.report_title)
+    view.labels = {name: t(text) for name, text in agent.labels.items()}
+    # 번역된 쿼리로는 키워드 분류가 안 되므로 카테고리는 원문 기준으로 미리 정해서 넣음
+    view.categories = {t(name): [] for name in agent.categories}
+    view.results = [
+        dict(result,
+             query=t(result['query']),
+             summary=t(result.get('summary')),
+             key_findings=[t(f) for f in (result.get('key_findings') or [])[:3]],
+             actionable_insight=t(result.get('actionable_insight')),
+             category=t(categories[result['query']]))
+        for result in agent.results
+    ]
+    view.skipped_queries = [t(q) for q in agent.skipped_queries]
+    view.html_renderer = HtmlReportRenderer(max_findings=agent.html_renderer.max_findings,
+                                            labels=view.labels, lang=locale)
+    return view
@@ -0,0 +1,64 @@
+"""
+Wire Schema
+search_with_claude 응답용 간결한 JSON 스키마 (짧은 키 + 필드별 길이 제한)
+
+리포트 / 렌더러 / 저장소가 실제로 쓰는 필드만 요청하고, 받은 응답은 기존 결과 dict 형태로 되돌림
+(요청하지 않은 필드는 빈 값으로 채워서 이후 단계는 그대로 동작)
+"""
+
+import json
+from typing import Dict, Iterable, List
+
+
+# 결과 필드 → 짧은 키, 설명, 글자 수 제한 (목록이면 항목 수와 항목당 글자 수)
+WIRE_FIELDS = {
+    'summary': {'key': 's', 'hint': '2문장 요약', 'chars': 200},
+    'key_findings': {'key': 'f', 'hint': '핵심 발견사항', 'chars': 80, 'items': 3},
+    'impact': {'key': 'i', 'hint': '광고사업개발 담당자에게 미치는 영향', 'chars': 120},
+    'actionable_insight': {'key': 'a', 'hint': '실행 가능한 인사이트', 'chars': 120},
+    'sources': {'key': 'src', 'hint': '출처 매체명 또는 URL', 'chars': 100, 'items': 3},
+}
+
+# 텍스트 리포트가 쓰는 필드
+REPORT_FIELDS = ('summary', 'key_findings', 'actionable_insight')
+
+
+def requested_fields(consumers: Iterable[Iterable[str]]) -> List[str]:
+    """소비자들이 쓰는 필드의 합집합 (WIRE_FIELDS 순서)"""
+    used = {field for fields in consumers for field in fields}
+    return [name for name in WIRE_FIELDS if name in used]
+
+
+def schema_prompt(fields: List[str]) -> str:
+    """프롬프트에 넣을 응답 형식 설명"""
+    template = {}
+    for name in fields:
+        spec = WIRE_FIELDS[name]
+        if 'items' in spec:
+            template[spec['key']] = [f"{spec['hint']} (최대 {spec['items']}개, 각 {spec['chars']}자 이내)"]
+        else:
+            template[spec['key']] = f"{spec['hint']} ({spec['chars']}자 이내)"
+
+    return (
+        "다음 JSON 형식으로만 응답해주세요 (키 이름 그대로, 괄호 안 글자 수 제한 준수, 다른 설명 없이):\n"
+        + json.dumps(template, ensure_ascii=False)
+    )
+
+
+def _cap(text, limit: int) -> str:
+    text = ' '.join(str(text or '').split())
+    return text if len(text) <= limit else text[:limit - 1].rstrip() + '…'
+
+
+def expand(wire: Dict, query: str, fields: List[str]) -> Dict:
+    """짧은 키 응답 → 기존 결과 dict (긴 키로 답한 경우도 허용, 길이 제한 적용)"""
+    result = {'query': query}
+    for name, spec in WIRE_FIELDS.items():
+        value = wire.get(spec['key'], wire.get(name)) if name in fields else None
+        if 'items' in spec:
+            if isinstance(value, str):
+                value = [value]
+            result[name] = [_cap(v, spec['chars']) for v in (value or []) if v][:spec['items']]
+        else:
+            result[name] = _cap(value, spec['chars'])
+    return result